@@ -0,0 +1,66 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark showing that runtime of :class:`cott.audit.Auditor` is proportional to new log data, not total history.
+
+Writes a log of generated tokens, audits it, then repeatedly appends a small amount of data and audits again.
+
+Usage: ``python benchmarks/bench_audit.py [--lines N] [--appended M] [--runs R]``
+"""
+
+import argparse
+import base64
+import itertools
+import pathlib
+import tempfile
+import time
+import typing
+
+from cott.audit import Auditor
+from cott.generator import Fleet, TokenGenerator
+
+
+def _write(path: pathlib.Path, tokens: typing.Iterator[bytes], count: int) -> None:
+    """
+    Appends access log lines for given number of tokens.
+
+    :param path: Path of log file.
+    :param tokens: Stream of assembled binary tokens.
+    :param count: Number of lines to be appended.
+    """
+    with path.open("ab") as file:
+        for token in itertools.islice(tokens, count):
+            file.write(b'127.0.0.1 - - [31/May/2024:12:00:00 +0000] "GET /?cott=' + base64.urlsafe_b64encode(token) + b' HTTP/1.1" 200 4096 "-" "-"\n')
+
+
+def main(lines: int, appended: int, runs: int) -> None:
+    """
+    Runs audit benchmark and prints runtime and throughput of every audit run.
+
+    :param lines: Number of log lines audited in initial run.
+    :param appended: Number of log lines appended before every subsequent run.
+    :param runs: Number of subsequent runs.
+    """
+    fleet = Fleet.create(1000, key=bytes.fromhex("000102030405060708090a0b0c0d0e0f"), seed=0)
+    tokens = (token for _, token in itertools.chain.from_iterable(TokenGenerator(fleet, replayed=0.01, forged=0.01, seed=0).batches()))
+    with tempfile.TemporaryDirectory() as directory:
+        log = pathlib.Path(directory) / "access.log"
+        _write(log, tokens, lines)
+        for run in range(runs + 1):
+            if run:
+                _write(log, tokens, appended)
+            with Auditor(pathlib.Path(directory) / "audit.db", fleet) as auditor:
+                start = time.perf_counter()
+                report = auditor.audit(log)
+                elapsed = time.perf_counter() - start
+            print(f"run {run}: {report.lines:>9} new lines of {log.stat().st_size / 1e6:8.1f} MB in {elapsed:7.3f} s ({report.lines / elapsed:9.0f} lines/s)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1000000)
+    parser.add_argument("--appended", type=int, default=10000)
+    parser.add_argument("--runs", type=int, default=3)
+    arguments = parser.parse_args()
+    main(arguments.lines, arguments.appended, arguments.runs)
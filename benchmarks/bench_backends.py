@@ -0,0 +1,121 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark running the same load against every configured :mod:`cott.server.backends` combination.
+
+Configurations are read from a JSON file containing a list of objects with optional `keystore` and `cache` settings
+as described in :mod:`cott.server.backends`. Without a file, the backends configured via `COTT_BACKEND_*` environment variables
+and the built-in backends are measured.
+
+Usage: ``python benchmarks/bench_backends.py [--config FILE] [--tokens N]``
+"""
+
+import argparse
+import json
+import time
+import typing
+
+import flask
+
+import cott
+import cott.server
+from cott.generator import Fleet, TokenGenerator
+from cott.server.backends import create_cache, create_keystore, load_config
+
+#: Backend combinations measured if no configuration file is given
+DEFAULTS = [
+    {"keystore": {"backend": "default"}, "cache": {"backend": "memory"}},
+    {"keystore": {"backend": "derived", "master": "000102030405060708090a0b0c0d0e0f"}, "cache": {"backend": "memory"}},
+]
+
+
+def _tokens(keystore: cott.IKeyStore, count: int) -> typing.List[cott.COTT]:
+    """
+    Generates load of valid, replayed and forged tokens for devices known to the key store.
+
+    :param keystore: Key store providing AES keys of simulated devices.
+    :param count: Number of tokens.
+    :returns: Generated tokens.
+    """
+    devices = Fleet.create(1000, key=bytes(16), seed=0)
+    fleet = Fleet({uid: keystore.get(uid) or bytes(16) for uid, _ in devices.items()})
+    return [token for _, token in TokenGenerator(fleet, replayed=0.1, forged=0.1, seed=0).stream(count)]
+
+
+def _name(config: typing.Any, default: str) -> str:
+    """
+    Determines backend name of configuration.
+
+    :param config: Backend configuration or name as accepted by :mod:`cott.server.backends`.
+    :param default: Name of default backend.
+    :returns: Configured backend name.
+    """
+    if isinstance(config, str):
+        return config
+    return str((config or {}).get("backend", default))
+
+
+def run_load(keystore: cott.IKeyStore, cache: cott.ICache, tokens: typing.Sequence[cott.COTT]) -> float:
+    """
+    Validates tokens directly against backends in the same order as :func:`cott.server.create_app`.
+
+    :param keystore: Key store backend.
+    :param cache: Cache backend.
+    :param tokens: Tokens to be validated.
+    :returns: Validated tokens per second.
+    """
+    start = time.perf_counter()
+    for token in tokens:
+        key = keystore.get(token.uid)
+        if key and not cache.used(token) and token.verify(key):
+            cache.claim(token)
+    return len(tokens) / (time.perf_counter() - start)
+
+
+def run_requests(keystore: cott.IKeyStore, cache: cott.ICache, tokens: typing.Sequence[cott.COTT]) -> float:
+    """
+    Validates tokens via requests to the flask test client.
+
+    :param keystore: Key store backend.
+    :param cache: Cache backend.
+    :param tokens: Tokens to be validated.
+    :returns: Requests per second.
+    """
+    app = cott.server.create_app(keystore=keystore, cache=cache, debug=False)
+    app.logger.disabled = True
+    client = app.test_client()
+    start = time.perf_counter()
+    for token in tokens:
+        client.get(f"/?cott={token.encode().decode()}")
+    return len(tokens) / (time.perf_counter() - start)
+
+
+def main(configurations: typing.List[typing.Dict[str, typing.Any]], count: int) -> None:
+    """
+    Runs load against every backend configuration and prints throughput.
+
+    :param configurations: Backend configurations with optional `keystore` and `cache` settings.
+    :param count: Number of tokens per configuration.
+    """
+    for configuration in configurations:
+        name = f"{_name(configuration.get('keystore'), 'default')}/{_name(configuration.get('cache'), 'memory')}"
+        tokens = _tokens(create_keystore(configuration.get("keystore")), count)
+        direct = run_load(create_keystore(configuration.get("keystore")), create_cache(configuration.get("cache")), tokens)
+        requests = run_requests(create_keystore(configuration.get("keystore")), create_cache(configuration.get("cache")), tokens[:count // 10])
+        print(f"{name:>24}: {direct:10.0f} tokens/s (backends) {requests:10.0f} requests/s (flask)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--config", help="JSON file with list of backend configurations")
+    parser.add_argument("--tokens", type=int, default=50000)
+    arguments = parser.parse_args()
+    if arguments.config:
+        with open(arguments.config, encoding="utf-8") as file:
+            main(json.load(file), arguments.tokens)
+    else:
+        environment = flask.Flask(__name__)
+        load_config(environment)
+        configured = {key.lower(): environment.config[key] for key in ("KEYSTORE", "CACHE") if key in environment.config}
+        main(([configured] if configured else []) + DEFAULTS, arguments.tokens)
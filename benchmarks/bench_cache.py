@@ -0,0 +1,80 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Contention benchmark comparing :class:`cott.server.cache.Cache` (single lock) with :class:`cott.server.cache.ShardedCache`.
+
+Every thread runs the `used`/`claim` sequence of the validation endpoint on its own share of tokens and on the share of
+the next thread, so with more than one thread every token is processed by two threads and the reported operations are
+twice the number of tokens. Besides throughput, the benchmark checks that every token was claimed exactly once.
+Run it on a free-threaded (no-GIL) Python build to measure true parallelism.
+
+Usage: ``python benchmarks/bench_cache.py [--tokens N] [--shards S]``
+"""
+
+import argparse
+import sys
+import threading
+import time
+import typing
+
+import cott
+from cott.generator import Fleet, TokenGenerator
+from cott.server.cache import Cache, ShardedCache
+
+
+def run(cache: cott.ICache, tokens: typing.Sequence[cott.COTT], threads: int) -> float:
+    """
+    Validates tokens against cache using given number of threads.
+
+    :param cache: Cache to be measured.
+    :param tokens: Distinct tokens, every token is processed by two threads.
+    :param threads: Number of concurrent threads.
+    :returns: Cache operations (`used` and `claim` pairs) per second.
+    :raises AssertionError: If a token was claimed more or less than once.
+    """
+    claimed = [0] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(index: int) -> None:
+        share = tokens[index::threads]
+        other = tokens[(index + 1) % threads::threads] if threads > 1 else []
+        barrier.wait()
+        for token in list(share) + list(other):
+            if not cache.used(token) and cache.claim(token):
+                claimed[index] += 1
+
+    workers = [threading.Thread(target=worker, args=(index,)) for index in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    assert sum(claimed) == len(tokens), f"{sum(claimed)} claims for {len(tokens)} tokens"
+    return (2 if threads > 1 else 1) * len(tokens) / elapsed
+
+
+def main(count: int, shards: int) -> None:
+    """
+    Runs contention benchmark at 1, 4, 16 and 64 threads and prints throughput.
+
+    :param count: Number of distinct tokens per run.
+    :param shards: Number of shards of :class:`cott.server.cache.ShardedCache`.
+    """
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    tokens = [token for _, token in TokenGenerator(Fleet.create(1000, key=bytes(16), seed=0), seed=0).stream(count)]
+    for threads in (1, 4, 16, 64):
+        single = run(Cache(), tokens, threads)
+        sharded = run(ShardedCache(shards), tokens, threads)
+        print(f"threads={threads:<3} {single:10.0f} ops/s (single lock) {sharded:10.0f} ops/s ({shards} shards)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=200000)
+    parser.add_argument("--shards", type=int, default=64)
+    arguments = parser.parse_args()
+    main(arguments.tokens, arguments.shards)
@@ -0,0 +1,62 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark measuring token throughput of :mod:`cott.generator`.
+
+Usage: ``python benchmarks/bench_generator.py [--tokens N] [--processes P]``
+"""
+
+import argparse
+import itertools
+import os
+import time
+import typing
+
+from cott.generator import Fleet, TokenGenerator, parallel_batches
+
+
+def _throughput(batches: typing.Iterator[typing.Sized], tokens: int) -> float:
+    """
+    Consumes batches until given number of tokens has been generated.
+
+    :param batches: Stream of token batches.
+    :param tokens: Number of tokens to consume.
+    :returns: Generated tokens per second.
+    """
+    start = time.perf_counter()
+    generated = 0
+    for batch in batches:
+        generated += len(batch)
+        if generated >= tokens:
+            break
+    return generated / (time.perf_counter() - start)
+
+
+def main(tokens: int, processes: int) -> None:
+    """
+    Runs generator benchmark for different fleet configurations and prints tokens per second.
+
+    :param tokens: Number of tokens generated per configuration.
+    :param processes: Number of worker processes in multi-process mode.
+    """
+    shared = Fleet.create(10000, key=bytes(16), seed=0)
+    individual = Fleet.create(10000, seed=0)
+    options: typing.Dict[str, typing.Any] = {"replayed": 0.1, "forged": 0.1}
+
+    print(f"{'shared key':>24}: {_throughput(TokenGenerator(shared, **options).batches(), tokens):12.0f} tokens/s")
+    print(f"{'individual keys':>24}: {_throughput(TokenGenerator(individual, **options).batches(), tokens // 10):12.0f} tokens/s")
+    stream = TokenGenerator(shared, **options).stream()
+    chunks = iter(lambda: list(itertools.islice(stream, 4096)), [])
+    print(f"{'stream of COTT objects':>24}: {_throughput(chunks, tokens // 10):12.0f} tokens/s")
+    batches = parallel_batches(shared, processes, **options)
+    print(f"{f'{processes} processes':>24}: {_throughput(batches, tokens * processes):12.0f} tokens/s")
+    batches.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=1000000)
+    parser.add_argument("--processes", type=int, default=os.cpu_count() or 1)
+    arguments = parser.parse_args()
+    main(arguments.tokens, arguments.processes)
@@ -0,0 +1,50 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark measuring key derivation cost of :class:`cott.kdf.DerivedKeyStore`.
+
+Usage: ``python benchmarks/bench_keystore.py [--uids N]``
+"""
+
+import argparse
+import time
+import typing
+
+from cott.generator import Fleet
+from cott.kdf import DerivedKeyStore
+
+
+def _rate(function: typing.Callable[[], typing.Any], count: int) -> float:
+    """
+    Measures rate of given function.
+
+    :param function: Function processing `count` keys.
+    :param count: Number of keys processed per call.
+    :returns: Keys per second.
+    """
+    start = time.perf_counter()
+    function()
+    return count / (time.perf_counter() - start)
+
+
+def main(count: int) -> None:
+    """
+    Runs key derivation benchmark and prints derived keys per second.
+
+    :param count: Number of distinct UIDs to derive keys for.
+    """
+    uids = [uid for uid, _ in Fleet.create(count, key=bytes(16), seed=0).items()]
+    master = bytes.fromhex("000102030405060708090a0b0c0d0e0f")
+
+    keystore = DerivedKeyStore(master, capacity=count)
+    print(f"{'derive (cache miss)':>24}: {_rate(lambda: [keystore.get(uid) for uid in uids], count):12.0f} keys/s")
+    print(f"{'cache hit':>24}: {_rate(lambda: [keystore.get(uid) for uid in uids], count):12.0f} keys/s")
+    print(f"{'derive_many':>24}: {_rate(lambda: DerivedKeyStore(master).derive_many(uids), count):12.0f} keys/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--uids", type=int, default=100000)
+    arguments = parser.parse_args()
+    main(arguments.uids)
@@ -0,0 +1,51 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Benchmark comparing full Jinja rendering of the result page with :class:`cott.server.render.PageRenderer`.
+
+Usage: ``python benchmarks/bench_render.py [iterations]``
+"""
+
+import sys
+import timeit
+
+import flask
+
+import cott
+import cott.server
+from cott.server.render import Outcome, PageRenderer
+
+
+def main(iterations: int = 20000) -> None:
+    """
+    Runs render benchmark and prints cost per rendered page.
+
+    :param iterations: Number of pages to be rendered per variant.
+    """
+    app = cott.server.create_app(debug=False)
+    app.logger.disabled = True
+    token = cott.COTT.decode(b"AAECAwQFBgcICQoLDA0ODxDbq1lCP77Fp74yxIzhqA4z")
+    fields = {field: getattr(token, field).hex() for field in ("header", "uid", "random", "mac")}
+    renderer = PageRenderer(app)
+
+    def jinja() -> bytes:
+        with app.app_context():
+            return flask.render_template("index.html", cott=fields, outcome=Outcome.FRESH).encode()
+
+    def precompiled() -> bytes:
+        return renderer.page(Outcome.FRESH, token)
+
+    assert jinja() == precompiled()
+    for name, function in (("jinja", jinja), ("precompiled", precompiled)):
+        elapsed = min(timeit.repeat(function, number=iterations, repeat=3))
+        print(f"{name:>12}: {elapsed / iterations * 1e6:8.2f} us/page")
+
+    client = app.test_client()
+    for name, query in (("missing", ""), ("used", f"cott={token.encode().decode()}")):
+        elapsed = min(timeit.repeat(f"client.get('/?{query}')", number=iterations // 10, repeat=3, globals={"client": client}))
+        print(f"{'GET ' + name:>12}: {elapsed / (iterations // 10) * 1e6:8.2f} us/request")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,127 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Sizing benchmark measuring how throughput of :mod:`cott.server.production` scales with the number of workers.
+
+Starts the production server for every worker count, drives it with concurrent client processes and prints the achieved
+requests per second. Results depend on the local machine, so run it on hardware comparable to the deployment target.
+
+Usage: ``python benchmarks/bench_workers.py [--max-workers N] [--seconds S] [--clients C]``
+"""
+
+import argparse
+import base64
+import http.client
+import itertools
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import time
+
+from cott.generator import Fleet, TokenGenerator
+from cott.server.keystore import KeyStore
+
+
+def _free_port() -> int:
+    """
+    Finds currently unused local TCP port.
+
+    :returns: Unused port number.
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(port: int, timeout: float = 10.0) -> None:
+    """
+    Waits until server answers its healthcheck endpoint.
+
+    :param port: Port the server listens on.
+    :param timeout: Seconds to wait before giving up.
+    :raises TimeoutError: If server did not start in time.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/healthcheck")
+            if connection.getresponse().status == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise TimeoutError(f"Server on port {port} did not start within {timeout} seconds")
+
+
+def _client(port: int, seconds: float) -> int:
+    """
+    Sends requests with COTTs of a simulated fleet (80% valid, 10% replayed, 10% forged) until time is up.
+
+    The fleet shares the default key of :class:`cott.server.keystore.KeyStore` used by the server.
+
+    :param port: Port the server listens on.
+    :param seconds: Duration of load in seconds.
+    :returns: Number of completed requests.
+    """
+    fleet = Fleet.create(1000, key=KeyStore().get(bytes(7)))
+    tokens = itertools.chain.from_iterable(TokenGenerator(fleet, replayed=0.1, forged=0.1).batches())
+    requests = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        token = base64.urlsafe_b64encode(next(tokens)[1]).decode()
+        connection = http.client.HTTPConnection("127.0.0.1", port)
+        connection.request("GET", f"/?cott={token}")
+        connection.getresponse().read()
+        connection.close()
+        requests += 1
+    return requests
+
+
+def measure(workers: int, seconds: float, clients: int) -> float:
+    """
+    Measures throughput of production server with given number of workers.
+
+    :param workers: Number of gunicorn workers.
+    :param seconds: Duration of load in seconds.
+    :param clients: Number of concurrent client processes.
+    :returns: Requests per second.
+    """
+    port = _free_port()
+    server = subprocess.Popen(  # pylint: disable=consider-using-with
+        [sys.executable, "-m", "cott.server.production", "--bind", f"127.0.0.1:{port}", "--workers", str(workers)],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        _wait_ready(port)
+        with multiprocessing.Pool(clients) as pool:
+            return sum(pool.starmap(_client, [(port, seconds)] * clients)) / seconds
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main(max_workers: int = 2 * (os.cpu_count() or 1), seconds: float = 5.0, clients: int = 0) -> None:
+    """
+    Runs sizing benchmark for 1, 2, 4, ... up to `max_workers` workers.
+
+    :param max_workers: Largest number of workers to be measured.
+    :param seconds: Duration of load per worker count in seconds.
+    :param clients: Number of concurrent client processes, by default twice the number of workers.
+    """
+    print(f"CPUs: {os.cpu_count()}")
+    workers = 1
+    while workers <= max_workers:
+        throughput = measure(workers, seconds, clients or 2 * workers)
+        print(f"workers={workers:<3} {throughput:10.1f} requests/s")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-workers", type=int, default=2 * (os.cpu_count() or 1))
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--clients", type=int, default=0)
+    arguments = parser.parse_args()
+    main(arguments.max_workers, arguments.seconds, arguments.clients)
@@ -84,6 +84,53 @@ def _generate_cmac(data: bytes, key: Key) -> MAC:
     return MAC(maccer.digest())
 
 
+def _double(block: int) -> int:
+    """
+    Doubles 128 bit value in GF(2^128) as required for AES CMAC subkey generation.
+
+    :param block: 128 bit value to be doubled.
+    :returns: Doubled value.
+    """
+    doubled = (block << 1) & ((1 << 128) - 1)
+    return doubled ^ 0x87 if block >> 127 else doubled
+
+
+def _generate_cmacs(data: typing.Sequence[bytes], key: Key) -> bytes:
+    """
+    Generates AES CMACs over multiple messages of equal length.
+
+    Equivalent to calling :func:`_generate_cmac` for every message, but encrypts the n-th block of all messages in a single
+    AES operation, which is considerably faster for large numbers of messages.
+
+    :param data: Messages of equal length to generate AES CMACs over.
+    :param key: AES key to use for CMAC generation.
+    :returns: Concatenation of generated 16 byte CMACs in order of given messages.
+    :raises ValueError: If messages differ in length.
+    """
+    if not data:
+        return b""
+    length = len(data[0])
+    if any(len(message) != length for message in data):
+        raise ValueError("Batched AES-CMAC generation requires messages of equal length")
+
+    cipher = Crypto.Cipher.AES.new(key, Crypto.Cipher.AES.MODE_ECB)
+    subkey = _double(int.from_bytes(cipher.encrypt(bytes(16)), "big"))
+    blocks = max(1, -(-length // 16))
+    if length == 0 or length % 16:
+        # Incomplete last block is padded and masked with second subkey
+        subkey = _double(subkey)
+        data = [message + b"\x80" + bytes(blocks * 16 - length - 1) for message in data]
+
+    size = 16 * len(data)
+    state = 0
+    for index in range(blocks):
+        chunk = int.from_bytes(b"".join(message[index * 16:(index + 1) * 16] for message in data), "big")
+        if index == blocks - 1:
+            chunk ^= int.from_bytes(subkey.to_bytes(16, "big") * len(data), "big")
+        state = int.from_bytes(cipher.encrypt((state ^ chunk).to_bytes(size, "big")), "big")
+    return state.to_bytes(size, "big")
+
+
 class COTT:
     """
     Cryptographic One-time Token abstraction.
@@ -124,6 +171,22 @@ class COTT:
             raise ValueError(f"Invalid COTT, must be 33 bytes long (is {len(assembled)})")
         return cls(assembled[0:2], assembled[2:9], assembled[9:17], assembled[17:])
 
+    @classmethod
+    def generate(cls, header: bytes, uid: UID7 | bytes, random: bytes, key: Key | bytes) -> COTT:
+        """
+        Generates valid COTT by calculating its MAC using the given key, as done by the OPTIGA (tm) Authenticate NBT.
+
+        To generate large numbers of COTTs for testing, use :class:`cott.generator.TokenGenerator`.
+
+        :param header: 2 byte header (`b"\x00\x01"` for the first generation T4Tplus applet).
+        :param uid: 7 byte NFC UID.
+        :param random: 8 byte random data.
+        :param key: AES key to be used for MAC generation.
+        :returns: Generated COTT.
+        :raises ValueError: If syntactically invalid data given.
+        """
+        return cls(header, uid, random, _generate_cmac(header + uid + random, Key(key)))
+
     @classmethod
     def decode(cls, encoded: bytes | str) -> COTT:
         """
@@ -248,3 +311,18 @@ class ICache(typing.Protocol):
 
         :param instance: COTT to be marked as used.
         """
+
+    def claim(self, instance: COTT) -> bool:
+        """
+        Marks given :class:`COTT` as used unless it has been used before.
+
+        The default implementation combines :meth:`ICache.used` and :meth:`ICache.use` and is not atomic.
+        Caches shared between threads need to override it, so that concurrent requests cannot both claim the same COTT.
+
+        :param instance: COTT to be marked as used.
+        :returns: `True` if COTT has not been used before and is now marked as used, otherwise `False`.
+        """
+        if self.used(instance):
+            return False
+        self.use(instance)
+        return True
@@ -0,0 +1,324 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Incremental audit of access logs, detecting replayed and forged :class:`cott.COTT` values after the fact.
+
+Every request whose target contains a `cott` query parameter is checked against a persistent index of previously seen tokens
+and, if a :class:`cott.IKeyStore` is given, verified using the device's AES key. The index and the read offset of every
+log file are stored in a SQLite database and updated in the same transaction, so each run only processes data appended
+since the previous run. Log files are identified by device and inode, so rotated (renamed) files are not processed twice,
+and by a fingerprint of their first line, so a new file reusing the inode of a deleted one is audited from the start.
+
+.. code-block:: bash
+
+  python -m cott.audit --index audit.db /var/log/nginx/access.log*
+"""
+
+from __future__ import annotations
+
+__all__ = ["UIDStatistics", "Report", "Auditor", "main"]
+
+import argparse
+import collections
+import dataclasses
+import hashlib
+import os
+import re
+import sqlite3
+import typing
+import urllib.parse
+
+import cott
+from cott.kdf import DerivedKeyStore
+
+#: Pattern extracting the request target from the first `"METHOD target HTTP/x"` field of a log line
+_REQUEST = re.compile(rb'"[A-Z]+ (\S+) HTTP/[0-9.]+"')
+
+#: Maximum number of bytes of the first log line used as fingerprint of a log file
+_FINGERPRINT_SIZE = 1024
+
+
+@dataclasses.dataclass
+class UIDStatistics:
+    """
+    Audit counters of a single device.
+    """
+
+    #: Number of tokens received
+    tokens: int = 0
+    #: Number of tokens that have been seen before
+    replayed: int = 0
+    #: Number of tokens with a MAC not matching the device's AES key
+    mac_failures: int = 0
+    #: Number of tokens for which no AES key was found
+    unknown: int = 0
+
+
+@dataclasses.dataclass
+class Report:
+    """
+    Result of a single audit run, only covering data processed in this run.
+    """
+
+    #: Number of processed log lines
+    lines: int = 0
+    #: Number of processed bytes
+    bytes: int = 0
+    #: Number of syntactically invalid tokens
+    malformed: int = 0
+    #: Counters per device UID
+    uids: typing.Dict[cott.UID7, UIDStatistics] = dataclasses.field(default_factory=lambda: collections.defaultdict(UIDStatistics))
+
+    def anomalies(self, replays: int = 1, mac_failures: int = 1) -> typing.Dict[cott.UID7, UIDStatistics]:
+        """
+        Filters devices with replay bursts or MAC failure spikes.
+
+        :param replays: Minimum number of replayed tokens to be reported.
+        :param mac_failures: Minimum number of MAC failures to be reported.
+        :returns: Counters of all devices exceeding one of the thresholds.
+        """
+        return {uid: stats for uid, stats in self.uids.items() if stats.replayed >= replays or stats.mac_failures >= mac_failures}
+
+
+class Auditor:
+    """
+    Incremental log auditor with persistent seen-token index and checkpointed log offsets.
+    """
+
+    def __init__(self, index: str | os.PathLike[str], keystore: typing.Optional[cott.IKeyStore] = None, chunk_size: int = 10000) -> None:
+        """
+        Constructor opening (or creating) the persistent audit index.
+
+        :param index: Path of SQLite database storing seen tokens and log offsets.
+        :param keystore: Optional :class:`cott.IKeyStore` to verify token MACs. If `None` given, only replays are detected.
+        :param chunk_size: Number of log lines processed per transaction.
+        """
+        self._keystore = keystore
+        self._chunk_size = chunk_size
+        self._connection = sqlite3.connect(index)
+        with self._connection:
+            self._connection.execute("CREATE TABLE IF NOT EXISTS seen (token BLOB PRIMARY KEY) WITHOUT ROWID")
+            self._connection.execute("CREATE TABLE IF NOT EXISTS checkpoints (file TEXT PRIMARY KEY, path TEXT NOT NULL, fingerprint BLOB NOT NULL, offset INTEGER NOT NULL)")
+
+    def close(self) -> None:
+        """
+        Closes the persistent audit index.
+        """
+        self._connection.close()
+
+    def __enter__(self) -> Auditor:
+        return self
+
+    def __exit__(self, *_: typing.Any) -> None:
+        self.close()
+
+    @staticmethod
+    def _identify(status: os.stat_result) -> str:
+        """
+        Creates identifier of log file that does not change if the file is renamed.
+
+        :param status: Status of log file.
+        :returns: Device and inode of log file.
+        """
+        return f"{status.st_dev}:{status.st_ino}"
+
+    @staticmethod
+    def _fingerprint(file: typing.BinaryIO) -> bytes:
+        """
+        Hashes the beginning of the first line of log file, keeping the current read position.
+
+        :param file: Log file opened in binary mode.
+        :returns: SHA-256 digest of the first line (at most :data:`_FINGERPRINT_SIZE` bytes).
+        """
+        position = file.tell()
+        file.seek(0)
+        head = file.readline(_FINGERPRINT_SIZE)
+        file.seek(position)
+        return hashlib.sha256(head).digest()
+
+    def _unseen(self, tokens: typing.List[bytes]) -> typing.List[bool]:
+        """
+        Checks which tokens have not been seen before and adds them to the index.
+
+        :param tokens: Assembled binary tokens in order of occurrence.
+        :returns: `True` for every token seen for the first time.
+        """
+        seen: typing.Set[bytes] = set()
+        for offset in range(0, len(tokens), 500):
+            part = tokens[offset:offset + 500]
+            seen.update(row[0] for row in self._connection.execute(f"SELECT token FROM seen WHERE token IN ({','.join('?' * len(part))})", part))
+        fresh = []
+        for token in tokens:
+            fresh.append(token not in seen)
+            seen.add(token)
+        self._connection.executemany("INSERT OR IGNORE INTO seen VALUES (?)", ((token,) for token, new in zip(tokens, fresh) if new))
+        return fresh
+
+    def _verify(self, tokens: typing.List[cott.COTT], report: Report) -> None:
+        """
+        Verifies MACs of tokens, calculating MACs for all tokens sharing an AES key at once.
+
+        :param tokens: Tokens to be verified.
+        :param report: Report to add unknown UIDs and MAC failures to.
+        """
+        assert self._keystore is not None
+        groups: typing.Dict[cott.Key, typing.List[cott.COTT]] = collections.defaultdict(list)
+        for token in tokens:
+            key = self._keystore.get(token.uid)
+            if key is None:
+                report.uids[token.uid].unknown += 1
+            else:
+                groups[key].append(token)
+        for key, group in groups.items():
+            macs = cott._generate_cmacs([token.header + token.uid + token.random for token in group], key)  # pylint: disable=protected-access
+            for index, token in enumerate(group):
+                if macs[16 * index:16 * index + 16] != token.mac:
+                    report.uids[token.uid].mac_failures += 1
+
+    def _process(self, lines: typing.List[bytes], report: Report) -> None:
+        """
+        Audits chunk of complete log lines.
+
+        :param lines: Log lines to be audited.
+        :param report: Report to add results to.
+        """
+        tokens = []
+        for line in lines:
+            # Only the request target counts, e.g. the Referer of the page's own favicon request also contains its COTT
+            request = _REQUEST.search(line)
+            if not request:
+                continue
+            # Parse and decode the whole value just like the server does, so tokens accepted there are never filed as malformed
+            query = urllib.parse.parse_qs(urllib.parse.urlsplit(request.group(1).decode("latin-1")).query, keep_blank_values=True)
+            if "cott" not in query:
+                continue
+            try:
+                tokens.append(cott.COTT.decode(query["cott"][0]))
+            except ValueError:
+                report.malformed += 1
+
+        for token, fresh in zip(tokens, self._unseen([token.assemble() for token in tokens])):
+            stats = report.uids[token.uid]
+            stats.tokens += 1
+            stats.replayed += not fresh
+        if self._keystore is not None:
+            self._verify(tokens, report)
+        report.lines += len(lines)
+        report.bytes += sum(len(line) for line in lines)
+
+    def audit(self, path: str | os.PathLike[str], report: typing.Optional[Report] = None) -> Report:
+        """
+        Audits data appended to log file since the previous run.
+
+        Incomplete last lines are left for the next run. If the file has been truncated or its first line changed (e.g. a new
+        file reusing the inode of a rotated one), it is audited from the start.
+
+        :param path: Path of log file.
+        :param report: Optional report to add results to, by default a new report is created.
+        :returns: Report of audit run.
+        """
+        report = report if report is not None else Report()
+        with open(path, "rb") as file:
+            status = os.fstat(file.fileno())
+            identifier = self._identify(status)
+            fingerprint = self._fingerprint(file)
+            row = self._connection.execute("SELECT offset, fingerprint FROM checkpoints WHERE file = ?", (identifier,)).fetchone()
+            offset = row[0] if row and row[0] <= status.st_size and row[1] == fingerprint else 0
+            file.seek(offset)
+            while True:
+                lines = file.readlines(self._chunk_size * 128)
+                if lines and not lines[-1].endswith(b"\n"):
+                    lines.pop()
+                if not lines:
+                    break
+                with self._connection:
+                    self._process(lines, report)
+                    if not offset:
+                        # First line is only guaranteed to be complete once it has been processed
+                        fingerprint = self._fingerprint(file)
+                    offset += sum(len(line) for line in lines)
+                    self._connection.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?)", (identifier, os.path.abspath(path), fingerprint, offset))
+                file.seek(offset)
+            if offset:
+                # Track renamed (rotated) files even if no data was appended
+                with self._connection:
+                    self._connection.execute("UPDATE checkpoints SET path = ? WHERE file = ?", (os.path.abspath(path), identifier))
+        return report
+
+    def audit_all(self, paths: typing.Iterable[str | os.PathLike[str]]) -> Report:
+        """
+        Audits data appended to multiple log files since the previous run and prunes checkpoints afterwards.
+
+        :param paths: Paths of log files, ideally ordered from oldest to newest.
+        :returns: Combined report of audit run.
+        """
+        report = Report()
+        for path in paths:
+            self.audit(path, report)
+        self.prune()
+        return report
+
+    def prune(self) -> int:
+        """
+        Removes checkpoints of log files that no longer exist at the path they were last audited at.
+
+        Rotated log files should be audited in the same run (see :meth:`audit_all`), so that their paths are updated first.
+
+        :returns: Number of removed checkpoints.
+        """
+        stale = []
+        for identifier, path in self._connection.execute("SELECT file, path FROM checkpoints").fetchall():
+            try:
+                if self._identify(os.stat(path)) == identifier:
+                    continue
+            except OSError:
+                pass
+            stale.append((identifier,))
+        with self._connection:
+            self._connection.executemany("DELETE FROM checkpoints WHERE file = ?", stale)
+        return len(stale)
+
+
+def _master_key(value: str) -> cott.Key:
+    """
+    Parses hex encoded AES master key given on the command line.
+
+    :param value: Hex encoded master key.
+    :returns: Parsed AES master key.
+    :raises argparse.ArgumentTypeError: If value is not a hex encoded 128 bit key.
+    """
+    try:
+        return cott.Key(bytes.fromhex(value))
+    except ValueError as error:
+        raise argparse.ArgumentTypeError(f"invalid master key, expected 32 hex digits ({error})") from error
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Parses command line, audits given log files and prints devices with anomalies.
+
+    :param argv: Command line arguments, by default :data:`sys.argv` is used.
+    """
+    parser = argparse.ArgumentParser(prog="python -m cott.audit", description="Incrementally audits access logs for replayed and forged COTTs.")
+    parser.add_argument("logs", nargs="+", help="log files, ordered from oldest to newest")
+    parser.add_argument("--index", default="cott-audit.db", help="SQLite database storing seen tokens and log offsets (default: %(default)s)")
+    parser.add_argument("--master-key", type=_master_key, help="hex encoded master key to verify MACs (see cott.kdf.DerivedKeyStore)")
+    parser.add_argument("--replays", type=int, default=1, help="minimum number of replays per UID to be reported (default: %(default)s)")
+    parser.add_argument("--mac-failures", type=int, default=1, help="minimum number of MAC failures per UID to be reported (default: %(default)s)")
+    arguments = parser.parse_args(argv)
+
+    keystore: typing.Optional[cott.IKeyStore] = None
+    if arguments.master_key:
+        keystore = DerivedKeyStore(arguments.master_key)
+
+    with Auditor(arguments.index, keystore) as auditor:
+        report = auditor.audit_all(arguments.logs)
+    print(f"Processed {report.lines} lines ({report.bytes} bytes), {report.malformed} malformed tokens")
+    print(f"{'UID':<14} {'tokens':>8} {'replayed':>8} {'MAC fail':>8} {'unknown':>8}")
+    for uid, stats in sorted(report.anomalies(arguments.replays, arguments.mac_failures).items()):
+        print(f"{uid.hex():<14} {stats.tokens:>8} {stats.replayed:>8} {stats.mac_failures:>8} {stats.unknown:>8}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,266 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Generator for large numbers of :class:`cott.COTT` values, simulating a fleet of OPTIGA (tm) Authenticate NBT devices.
+
+Intended for load testing and benchmarks. It emits valid, replayed and forged tokens in configurable ratios. Random data
+is taken from :mod:`random`, which is fast and reproducible but NOT suitable for any cryptographic purpose.
+
+.. code-block:: py
+
+    from cott.generator import Fleet, TokenGenerator
+
+    fleet = Fleet.create(1000)
+    for kind, token in TokenGenerator(fleet, replayed=0.1, forged=0.1).stream(10):
+        print(kind.name, token.encode())
+"""
+
+from __future__ import annotations
+
+__all__ = ["TokenKind", "Fleet", "TokenGenerator", "parallel_batches"]
+
+import collections
+import enum
+import itertools
+import multiprocessing
+import random
+import typing
+
+import cott
+
+
+class TokenKind(enum.Enum):
+    """
+    Kind of generated token, determining the expected validation outcome.
+    """
+
+    #: Fresh token with valid MAC
+    VALID = 0
+    #: Valid token that has been emitted before
+    REPLAYED = 1
+    #: Token of a known UID with a random (invalid) MAC
+    FORGED = 2
+
+
+#: All token kinds, ordered by value
+_KINDS = list(TokenKind)
+
+
+#: List of generated tokens with their kind, tokens are assembled binary COTT data (see :meth:`cott.COTT.assemble`)
+Batch = typing.List[typing.Tuple[TokenKind, bytes]]
+
+
+class Fleet(cott.IKeyStore):
+    """
+    Simulated fleet of devices, implementing :class:`cott.IKeyStore` so it can be passed to the COTT server directly.
+    """
+
+    def __init__(self, keys: typing.Optional[typing.Mapping[cott.UID7 | bytes, cott.Key | bytes]] = None) -> None:
+        """
+        Constructor storing AES keys of simulated devices.
+
+        :param keys: Mapping of device UIDs to AES keys.
+        """
+        super().__init__()
+        self._lookup: typing.Dict[cott.UID7, cott.Key] = {cott.UID7(uid): cott.Key(key) for uid, key in (keys or {}).items()}
+
+    @classmethod
+    def create(cls, size: int, key: typing.Optional[cott.Key | bytes] = None, seed: typing.Optional[int] = None) -> Fleet:
+        """
+        Creates fleet of devices with random UIDs.
+
+        :param size: Number of devices in fleet.
+        :param key: AES key shared by all devices. If `None` given, every device gets its own random key.
+        :param seed: Optional seed to create reproducible fleets.
+        :returns: Created fleet.
+        """
+        generator = random.Random(seed)
+        uids: typing.Set[bytes] = set()
+        while len(uids) < size:
+            uids.add(generator.randbytes(7))
+        return cls({uid: key if key is not None else generator.randbytes(16) for uid in sorted(uids)})
+
+    def get(self, uid: cott.UID7 | bytes) -> typing.Optional[cott.Key]:
+        return self._lookup.get(cott.UID7(uid))
+
+    def set(self, uid: cott.UID7 | bytes, key: cott.Key | bytes) -> None:
+        self._lookup[cott.UID7(uid)] = cott.Key(key)
+
+    def items(self) -> typing.ItemsView[cott.UID7, cott.Key]:
+        """
+        Returns UIDs and AES keys of all devices in fleet.
+
+        :returns: View of UID and AES key pairs.
+        """
+        return self._lookup.items()
+
+    def __len__(self) -> int:
+        return len(self._lookup)
+
+
+class TokenGenerator:  # pylint: disable=too-many-instance-attributes
+    """
+    Generates streams of COTT values for a :class:`Fleet`.
+
+    MACs of valid tokens are calculated in batches for all devices sharing an AES key, so throughput is highest for fleets
+    sharing few keys. Replayed tokens are drawn from a bounded history of previously generated valid tokens.
+    """
+
+    def __init__(self, fleet: Fleet, *, replayed: float = 0.0, forged: float = 0.0, header: bytes = b"\x00\x01",  # pylint: disable=too-many-arguments
+                 batch_size: int = 4096, history: int = 4096, seed: typing.Optional[int] = None) -> None:
+        """
+        Constructor validating and storing generator configuration.
+
+        :param fleet: Fleet of devices to generate tokens for.
+        :param replayed: Share of replayed tokens (0.0 to 1.0).
+        :param forged: Share of forged tokens (0.0 to 1.0).
+        :param header: 2 byte header of generated tokens.
+        :param batch_size: Number of tokens generated per batch.
+        :param history: Number of previously generated valid tokens available for replays.
+        :param seed: Optional seed to generate reproducible streams.
+        :raises ValueError: If invalid configuration given.
+        """
+        if not fleet:
+            raise ValueError("Token generation requires a fleet of at least one device")
+        if replayed < 0 or forged < 0 or replayed + forged > 1:
+            raise ValueError(f"Invalid token ratios, shares must be non-negative and not exceed 1 (replayed={replayed}, forged={forged})")
+        if replayed and replayed + forged >= 1:
+            raise ValueError("Replayed tokens require a non-zero share of valid tokens")
+        if len(header) != 2:
+            raise ValueError(f"Invalid COTT header, must be 2 bytes long (is {len(header)})")
+        if batch_size < 1 or history < 1:
+            raise ValueError(f"Batch size and history must be positive (batch_size={batch_size}, history={history})")
+        self._header = header
+        self._batch_size = batch_size
+        self._history_size = history
+        self._history: typing.List[bytes] = []
+        self._weights = [1.0 - replayed - forged, replayed, forged]
+        self._random = random.Random(seed)
+        self._uids: typing.List[bytes] = [bytes(uid) for uid, _ in fleet.items()]
+        self._keys: typing.Dict[bytes, cott.Key] = {bytes(uid): key for uid, key in fleet.items()}
+        self._groups: typing.List[cott.Key] = list(set(self._keys.values()))
+
+    def _valid(self, count: int) -> typing.List[bytes]:
+        """
+        Generates fresh and valid tokens for random devices.
+
+        :param count: Number of tokens to generate.
+        :returns: Assembled binary tokens.
+        """
+        randoms = self._random.randbytes(8 * count)
+        messages = [self._header + uid + randoms[8 * index:8 * index + 8] for index, uid in enumerate(self._random.choices(self._uids, k=count))]
+        if len(self._groups) == 1:
+            macs = cott._generate_cmacs(messages, self._groups[0])  # pylint: disable=protected-access
+            return [message + macs[16 * index:16 * index + 16] for index, message in enumerate(messages)]
+
+        groups: typing.Dict[cott.Key, typing.List[int]] = collections.defaultdict(list)
+        for index, message in enumerate(messages):
+            groups[self._keys[message[2:9]]].append(index)
+        tokens = [b""] * count
+        for key, indices in groups.items():
+            macs = cott._generate_cmacs([messages[index] for index in indices], key)  # pylint: disable=protected-access
+            for offset, index in enumerate(indices):
+                tokens[index] = messages[index] + macs[16 * offset:16 * offset + 16]
+        return tokens
+
+    def _forged(self, count: int) -> typing.List[bytes]:
+        """
+        Generates tokens with random data and MAC for random devices.
+
+        :param count: Number of tokens to generate.
+        :returns: Assembled binary tokens.
+        """
+        randoms = self._random.randbytes(24 * count)
+        return [self._header + uid + randoms[24 * index:24 * index + 24] for index, uid in enumerate(self._random.choices(self._uids, k=count))]
+
+    def batch(self, size: typing.Optional[int] = None) -> Batch:
+        """
+        Generates batch of tokens with kinds randomly distributed according to the configured ratios.
+
+        :param size: Number of tokens to generate, by default the configured batch size.
+        :returns: Generated tokens with their kind.
+        """
+        kinds = self._random.choices(_KINDS, weights=self._weights, k=self._batch_size if size is None else size)
+        valid = iter(self._valid(kinds.count(TokenKind.VALID)))
+        forged = iter(self._forged(kinds.count(TokenKind.FORGED)))
+        emitted = self._history
+        tokens: Batch = []
+        for kind in kinds:
+            if kind is TokenKind.REPLAYED and emitted:
+                token = emitted[int(self._random.random() * len(emitted))]
+            elif kind is TokenKind.FORGED:
+                token = next(forged)
+            else:
+                # Nothing to replay at start of stream, so first replays are fresh tokens instead
+                kind, token = TokenKind.VALID, next(valid, None) or self._valid(1)[0]
+                emitted.append(token)
+            tokens.append((kind, token))
+        self._history = emitted[-self._history_size:]
+        return tokens
+
+    def batches(self) -> typing.Iterator[Batch]:
+        """
+        Generates infinite stream of token batches.
+
+        :returns: Iterator over batches as returned by :meth:`TokenGenerator.batch`.
+        """
+        while True:
+            yield self.batch()
+
+    def stream(self, count: typing.Optional[int] = None) -> typing.Iterator[typing.Tuple[TokenKind, cott.COTT]]:
+        """
+        Generates stream of parsed tokens.
+
+        :param count: Number of tokens to generate, by default the stream is infinite.
+        :returns: Iterator over generated tokens with their kind.
+        """
+        tokens = itertools.chain.from_iterable(self.batches())
+        for kind, token in itertools.islice(tokens, count):
+            yield kind, cott.COTT.dissemble(token)
+
+
+#: Token generator of current worker process used by :func:`parallel_batches`
+_worker: typing.Optional[TokenGenerator] = None  # pylint: disable=invalid-name
+
+
+def _initialize_worker(fleet: Fleet, options: typing.Dict[str, typing.Any]) -> None:
+    """
+    Creates token generator of worker process.
+
+    :param fleet: Fleet of devices to generate tokens for.
+    :param options: Keyword arguments for :class:`TokenGenerator`.
+    """
+    global _worker  # pylint: disable=global-statement
+    _worker = TokenGenerator(fleet, **options)
+
+
+def _generate_batch() -> Batch:
+    """
+    Generates batch of tokens in worker process.
+
+    :returns: Generated batch of tokens.
+    """
+    assert _worker is not None
+    return _worker.batch()
+
+
+def parallel_batches(fleet: Fleet, processes: typing.Optional[int] = None, **options: typing.Any) -> typing.Generator[Batch, None, None]:
+    """
+    Generates infinite stream of token batches using multiple worker processes.
+
+    Every worker process has its own :class:`TokenGenerator` (and thus its own replay history), so streams are not
+    reproducible even if a `seed` is given. At most two batches per process are buffered ahead of the consumer.
+
+    :param fleet: Fleet of devices to generate tokens for.
+    :param processes: Number of worker processes, by default the number of CPUs.
+    :param options: Keyword arguments for :class:`TokenGenerator`, the `seed` is ignored.
+    :returns: Iterator over batches as returned by :meth:`TokenGenerator.batch`.
+    """
+    options.pop("seed", None)
+    TokenGenerator(fleet, **options)  # validate options before starting workers
+    with multiprocessing.Pool(processes, initializer=_initialize_worker, initargs=(fleet, options)) as pool:
+        pending = collections.deque(pool.apply_async(_generate_batch) for _ in range(2 * (processes or multiprocessing.cpu_count())))
+        while True:
+            yield pending.popleft().get()
+            pending.append(pool.apply_async(_generate_batch))
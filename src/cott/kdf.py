@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Key diversification deriving device specific AES keys from a master key.
+
+Only depends on the :mod:`cott` core, so it can be used without the flask server, e.g. by :mod:`cott.audit`.
+"""
+__all__ = ["DerivedKeyStore"]
+
+import collections
+import threading
+import typing
+
+import cott
+
+
+class DerivedKeyStore(cott.IKeyStore):
+    """
+    Implementation of :class:`cott.IKeyStore` diversifying device specific AES keys from a master key and the device's UID.
+
+    Keys are derived using the KDF in counter mode as specified in NIST SP 800-108 with AES-CMAC as pseudorandom function:
+    `key = AES-CMAC(master, 0x00000001 || label || 0x00 || uid || 0x00000080)`.
+    No key table is required, only the most recently used derived keys are kept in a bounded cache.
+    """
+
+    def __init__(self, master: cott.Key | bytes, label: bytes = b"COTT", capacity: int = 65536) -> None:
+        """
+        Constructor validating and storing key derivation parameters.
+
+        :param master: AES master key to derive device keys from.
+        :param label: Label identifying the purpose of the derived keys.
+        :param capacity: Maximum number of derived keys to be cached.
+        :raises ValueError: If invalid master key or capacity given.
+        """
+        super().__init__()
+        if capacity < 0:
+            raise ValueError(f"Invalid key cache capacity, must not be negative (is {capacity})")
+        self._master = cott.Key(master)
+        self._label = label
+        self._capacity = capacity
+        self._cache: typing.OrderedDict[cott.UID7, cott.Key] = collections.OrderedDict()
+        self._overrides: typing.Dict[cott.UID7, cott.Key] = {}
+        self._lock = threading.Lock()
+
+    def _message(self, uid: cott.UID7) -> bytes:
+        """
+        Assembles fixed input data of the KDF for given UID.
+
+        :param uid: 7 byte UID to derive AES key for.
+        :returns: Input data for AES-CMAC.
+        """
+        return b"\x00\x00\x00\x01" + self._label + b"\x00" + uid + b"\x00\x00\x00\x80"
+
+    def _remember(self, uid: cott.UID7, key: cott.Key) -> None:
+        """
+        Stores derived key in cache, evicting the least recently used key if cache is full.
+
+        :param uid: 7 byte UID of derived key.
+        :param key: Derived AES key.
+        """
+        if not self._capacity:
+            return
+        with self._lock:
+            self._cache[uid] = key
+            self._cache.move_to_end(uid)
+            if len(self._cache) > self._capacity:
+                self._cache.popitem(last=False)
+
+    def derive(self, uid: cott.UID7 | bytes) -> cott.Key:
+        """
+        Derives AES key for given :class:`cott.UID7`, ignoring cache and explicitly set keys.
+
+        :param uid: 7 byte UID to derive AES key for.
+        :returns: Derived AES key.
+        """
+        return cott.Key(cott._generate_cmac(self._message(cott.UID7(uid)), self._master))  # pylint: disable=protected-access
+
+    def derive_many(self, uids: typing.Iterable[cott.UID7 | bytes]) -> typing.List[cott.Key]:
+        """
+        Derives AES keys for multiple UIDs at once, which is considerably faster than calling :meth:`derive` for every UID.
+
+        :param uids: 7 byte UIDs to derive AES keys for.
+        :returns: Derived AES keys in order of given UIDs.
+        """
+        messages = [self._message(cott.UID7(uid)) for uid in uids]
+        keys = cott._generate_cmacs(messages, self._master)  # pylint: disable=protected-access
+        return [cott.Key(keys[offset:offset + 16]) for offset in range(0, len(keys), 16)]
+
+    def prefetch(self, uids: typing.Iterable[cott.UID7 | bytes]) -> None:
+        """
+        Derives AES keys for multiple UIDs via :meth:`derive_many` and stores them in cache, e.g. to warm up the cache.
+
+        :param uids: 7 byte UIDs to derive AES keys for.
+        """
+        parsed = [cott.UID7(uid) for uid in uids]
+        for uid, key in zip(parsed, self.derive_many(parsed)):
+            self._remember(uid, key)
+
+    def get(self, uid: cott.UID7 | bytes) -> typing.Optional[cott.Key]:
+        uid = cott.UID7(uid)
+        if uid in self._overrides:
+            return self._overrides[uid]
+        with self._lock:
+            key = self._cache.get(uid)
+            if key is not None:
+                self._cache.move_to_end(uid)
+                return key
+        key = self.derive(uid)
+        self._remember(uid, key)
+        return key
+
+    def set(self, uid: cott.UID7 | bytes, key: cott.Key | bytes) -> None:
+        """
+        Sets AES key to be used for given :class:`cott.UID7` instead of the derived key.
+
+        Explicitly set keys are not bounded by the cache capacity, so this should only be used for few devices.
+
+        :param uid: 7 byte UID to set AES key for.
+        :param key: AES key to be used for UID.
+        """
+        self._overrides[cott.UID7(uid)] = cott.Key(key)
@@ -8,36 +8,47 @@ Builds on :class:`flask.Flask` to showcase how to implement backend service vali
 """
 __all__ = ["create_app"]
 
+import functools
 import typing
 
 import flask
 from flask_cors import CORS
 
 import cott
-from cott.server.cache import Cache
-from cott.server.keystore import KeyStore
+from cott.server.backends import create_cache, create_keystore, load_config
+from cott.server.render import Outcome, PageRenderer
 
 
 def create_app(keystore: typing.Optional[cott.IKeyStore] = None, cache: typing.Optional[cott.ICache] = None, debug: bool | None = None) -> flask.Flask:
     """
     Factory method creating main flask application providing COTT server API.
 
-    :param keystore: Optional :class:`cott.IKeyStore` to be used. By default new :class:`cott.server.keystore.KeyStore` will be used.
-    :param cache: Optional :class:`cott.ICache` to be used. By default new :class:`cott.server.cache.Cache` will be used.
+    Unless given, backends are created from the `KEYSTORE` and `CACHE` settings loaded via :func:`cott.server.backends.load_config`.
+
+    :param keystore: Optional :class:`cott.IKeyStore` to be used. By default the configured backend or new :class:`cott.server.keystore.KeyStore` will be used.
+    :param cache: Optional :class:`cott.ICache` to be used. By default the configured backend or new :class:`cott.server.cache.Cache` will be used.
     :param debug: Optional flag to enable debug mode, disabling CORS checks for local test server. If `None` given, :attr:`app.debug` will be used
     """
     app = flask.Flask(__name__)
+    #: Static assets (e.g. stylesheet) are revalidated via their `ETag` once cached copies are older than an hour
+    app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 3600
+    load_config(app)
 
     if debug is None:  # pragma: no cover
         debug = app.debug
 
     #: Keystore used for lookup from UID to matching AES key
-    if not keystore:  # pragma: no cover
-        keystore = KeyStore()
+    if keystore is None:
+        keystore = create_keystore(app.config.get("KEYSTORE"))
 
     #: Cache of previously used COTT values to avoid replay attacks
-    if not cache:  # pragma: no cover
-        cache = Cache()
+    if cache is None:
+        cache = create_cache(app.config.get("CACHE"))
+
+    app.extensions["cott"] = {"keystore": keystore, "cache": cache}
+
+    #: Caches implementing only `used` and `use` fall back to the non-atomic default of :meth:`cott.ICache.claim`
+    claim = getattr(cache, "claim", functools.partial(cott.ICache.claim, cache))
 
     #: CORS utility to allow connections from e.g. OpenAPI client
     if debug:  # pragma: no cover
@@ -47,6 +58,9 @@ def create_app(keystore: typing.Optional[cott.IKeyStore] = None, cache: typing.O
     if debug:  # pragma: no cover
         keystore.set(cott.UID7(bytes.fromhex("02030405060708")), cott.Key(bytes.fromhex("000102030405060708090a0b0c0d0e0f")))
 
+    #: Renderer serving result pages from precompiled template fragments
+    renderer = PageRenderer(app)
+
     @app.route("/", methods=["HEAD", "GET"])
     def validate_endpoint() -> flask.Response:
         """
@@ -61,32 +75,31 @@ def create_app(keystore: typing.Optional[cott.IKeyStore] = None, cache: typing.O
         # Parse COTT from query string
         if "cott" not in flask.request.args:
             app.logger.warning("Missing 'cott' query parameter")
-            return flask.make_response(flask.render_template("index.html"), 400)
+            return renderer.render(Outcome.INVALID)
         try:
             to_validate = cott.COTT.decode(flask.request.args["cott"])
         except ValueError:
             app.logger.warning("Syntactically invalid COTT data")
-            return flask.make_response(flask.render_template("index.html"), 400)
+            return renderer.render(Outcome.INVALID)
 
         # Validate COTT
-        fresh = True
-        status = 200
+        outcome = Outcome.FRESH
         key = keystore.get(to_validate.uid)
         if not key:
             app.logger.warning("No key found for UID %s", to_validate.uid.hex())
-            status = 404
+            outcome = Outcome.UNKNOWN_UID
         elif cache.used(to_validate):
             app.logger.warning("COTT has been used before")
-            fresh = False
-            status = 429
+            outcome = Outcome.USED
         elif not to_validate.verify(key):
             app.logger.warning("COTT MAC not matching -> invalid AES key")
-            status = 403
-        else:
-            # Mark COTT as used
-            cache.use(to_validate)
+            outcome = Outcome.WRONG_KEY
+        elif not claim(to_validate):
+            # Mark COTT as used, atomically detecting concurrent requests with the same COTT
+            app.logger.warning("COTT has been used before")
+            outcome = Outcome.USED
 
-        return flask.make_response(flask.render_template("index.html", cott=to_validate, fresh=fresh, key=key), status)
+        return renderer.render(outcome, to_validate)
 
     @app.route("/healthcheck", methods=["HEAD", "GET"])
     def healthcheck_endpoint() -> flask.Response:
@@ -0,0 +1,159 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Registry of :class:`cott.IKeyStore` and :class:`cott.ICache` backends selectable via configuration.
+
+:func:`cott.server.create_app` builds its backends from the `KEYSTORE` and `CACHE` settings of the flask configuration.
+Each setting is a mapping with the registered `backend` name (or an importable `module:factory` path) and the keyword
+arguments of the backend's factory, or just the backend name if no arguments are needed. The settings are read from the JSON file given via the `COTT_CONFIG` environment
+variable and from `COTT_BACKEND_*` environment variables, with JSON values and nested keys separated by `__`. No other
+settings are taken over, so unrelated `COTT_*` variables (e.g. of :mod:`cott.server.production`) cannot change the app:
+
+.. code-block:: bash
+
+  export COTT_BACKEND_KEYSTORE='{"backend": "derived", "master": "000102030405060708090a0b0c0d0e0f", "capacity": 100000}'
+  export COTT_BACKEND_CACHE=sharded
+"""
+
+from __future__ import annotations
+
+__all__ = ["register_keystore", "register_cache", "create_keystore", "create_cache", "load_config"]
+
+import importlib
+import json
+import os
+import typing
+
+import flask
+
+import cott
+from cott.kdf import DerivedKeyStore
+from cott.server.cache import Cache, ShardedCache
+from cott.server.keystore import KeyStore
+
+#: Factories of registered key store backends
+_keystores: typing.Dict[str, typing.Callable[..., cott.IKeyStore]] = {}
+
+#: Factories of registered cache backends
+_caches: typing.Dict[str, typing.Callable[..., cott.ICache]] = {}
+
+
+def register_keystore(name: str, factory: typing.Callable[..., cott.IKeyStore]) -> None:
+    """
+    Registers :class:`cott.IKeyStore` backend to be selectable via configuration.
+
+    :param name: Name of backend used in configuration.
+    :param factory: Callable creating backend from configured keyword arguments.
+    """
+    _keystores[name] = factory
+
+
+def register_cache(name: str, factory: typing.Callable[..., cott.ICache]) -> None:
+    """
+    Registers :class:`cott.ICache` backend to be selectable via configuration.
+
+    :param name: Name of backend used in configuration.
+    :param factory: Callable creating backend from configured keyword arguments.
+    """
+    _caches[name] = factory
+
+
+def _create(kind: str, registry: typing.Mapping[str, typing.Callable[..., typing.Any]], config: str | typing.Mapping[str, typing.Any], default: str) -> typing.Any:
+    """
+    Creates backend from configuration.
+
+    :param kind: Kind of backend used in error messages.
+    :param registry: Registered backend factories.
+    :param config: Backend configuration with `backend` name and factory keyword arguments (case-insensitive), or only the backend name.
+    :param default: Name of backend used if configuration does not name one.
+    :returns: Created backend.
+    :raises ValueError: If unknown backend or invalid arguments given.
+    """
+    if isinstance(config, str):
+        config = {"backend": config}
+    elif not isinstance(config, typing.Mapping):
+        raise ValueError(f"Invalid {kind} configuration, expected backend name or mapping (got {type(config).__name__})")
+    options = {str(key).lower(): value for key, value in config.items()}
+    name = str(options.pop("backend", default))
+    if name in registry:
+        factory = registry[name]
+    elif ":" in name:
+        module, _, attribute = name.partition(":")
+        factory = getattr(importlib.import_module(module), attribute)
+    else:
+        raise ValueError(f"Unknown {kind} backend '{name}', must be one of {sorted(registry)} or 'module:factory'")
+    try:
+        return factory(**options)
+    except TypeError as error:
+        raise ValueError(f"Invalid options for {kind} backend '{name}': {error}") from error
+
+
+def create_keystore(config: typing.Optional[str | typing.Mapping[str, typing.Any]] = None) -> cott.IKeyStore:
+    """
+    Creates :class:`cott.IKeyStore` backend from configuration.
+
+    :param config: Backend configuration or name, by default :class:`cott.server.keystore.KeyStore` is created.
+    :returns: Created key store.
+    :raises ValueError: If unknown backend or invalid options given.
+    """
+    return typing.cast(cott.IKeyStore, _create("keystore", _keystores, {} if config is None else config, "default"))
+
+
+def create_cache(config: typing.Optional[str | typing.Mapping[str, typing.Any]] = None) -> cott.ICache:
+    """
+    Creates :class:`cott.ICache` backend from configuration.
+
+    :param config: Backend configuration or name, by default :class:`cott.server.cache.Cache` is created.
+    :returns: Created cache.
+    :raises ValueError: If unknown backend or invalid options given.
+    """
+    return typing.cast(cott.ICache, _create("cache", _caches, {} if config is None else config, "memory"))
+
+
+def load_config(app: flask.Flask) -> None:
+    """
+    Loads `KEYSTORE` and `CACHE` settings from JSON file given via `COTT_CONFIG` and from `COTT_BACKEND_*` environment variables.
+
+    A relative `COTT_CONFIG` path is resolved against the current working directory.
+
+    :param app: Flask application to load configuration for.
+    """
+    config = flask.Config(app.root_path)
+    if "COTT_CONFIG" in os.environ:
+        config.from_file(os.path.abspath(os.environ["COTT_CONFIG"]), load=json.load)
+    config.from_prefixed_env("COTT_BACKEND")
+    app.config.update({key: config[key] for key in ("KEYSTORE", "CACHE") if key in config})
+
+
+def _hex(value: str | bytes) -> bytes:
+    """
+    Converts hex encoded configuration value to bytes.
+
+    :param value: Hex string (or already binary) value.
+    :returns: Binary value.
+    :raises ValueError: If value is not a hex string, e.g. because an unquoted JSON number was given.
+    """
+    if isinstance(value, bytes):
+        return value
+    if not isinstance(value, str):
+        raise ValueError(f"Expected hex string, got {type(value).__name__} (quote values in JSON)")
+    return bytes.fromhex(value)
+
+
+def _derived(master: str | bytes, label: str | bytes = b"COTT", capacity: int = 65536) -> DerivedKeyStore:
+    """
+    Creates :class:`cott.kdf.DerivedKeyStore` from configuration values.
+
+    :param master: Hex encoded AES master key.
+    :param label: Label of derived keys.
+    :param capacity: Maximum number of cached derived keys.
+    :returns: Created key store.
+    """
+    return DerivedKeyStore(_hex(master), label.encode() if isinstance(label, str) else label, int(capacity))
+
+
+register_keystore("default", KeyStore)
+register_keystore("derived", _derived)
+register_cache("memory", Cache)
+register_cache("sharded", ShardedCache)
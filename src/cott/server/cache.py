@@ -7,8 +7,9 @@ Example implementation of :class:`cott.ICache`.
 Can be extended to support real implementation by previously used COTT values in a persistent database.
 """
 
-__all__ = ["Cache"]
+__all__ = ["Cache", "ShardedCache"]
 
+import threading
 import typing
 
 import cott
@@ -29,9 +30,77 @@ class Cache(cott.ICache):
     def __init__(self) -> None:
         super().__init__()
         self._cache: typing.Set[cott.COTT] = set()
+        self._lock = threading.Lock()
 
     def used(self, instance: cott.COTT) -> bool:
         return instance in self._cache
 
     def use(self, instance: cott.COTT) -> None:
-        self._cache.add(instance)
+        with self._lock:
+            self._cache.add(instance)
+
+    def claim(self, instance: cott.COTT) -> bool:
+        with self._lock:
+            if instance in self._cache:
+                return False
+            self._cache.add(instance)
+            return True
+
+
+class ShardedCache(cott.ICache):
+    """
+    Memory-based implementation of :class:`cott.ICache` for multithreaded servers, caching COTTs used since server started.
+
+    COTTs are distributed to shards by their MAC, every shard has its own lock so that concurrent requests rarely contend.
+    COTTs are stored in their assembled binary form, which needs considerably less memory than :class:`cott.COTT` objects.
+    All shared state is guarded by explicit locks, so the cache does not rely on the GIL and is also correct on
+    free-threaded Python builds.
+
+    In real implementation, this should be stored persistently in a secured database.
+    """
+
+    def __init__(self, shards: int = 64) -> None:
+        """
+        Constructor creating empty shards.
+
+        :param shards: Number of shards, should be well above the number of threads accessing the cache.
+        :raises ValueError: If invalid number of shards given.
+        """
+        super().__init__()
+        if shards < 1:
+            raise ValueError(f"Invalid number of shards, must be positive (is {shards})")
+        self._shards: typing.List[typing.Set[bytes]] = [set() for _ in range(shards)]
+        self._locks = [threading.Lock() for _ in range(shards)]
+
+    def _shard(self, assembled: bytes) -> int:
+        """
+        Selects shard of COTT based on the last bytes of its MAC, which are uniformly distributed.
+
+        :param assembled: Assembled binary COTT.
+        :returns: Index of shard.
+        """
+        return int.from_bytes(assembled[-4:], "little") % len(self._shards)
+
+    def used(self, instance: cott.COTT) -> bool:
+        assembled = instance.assemble()
+        index = self._shard(assembled)
+        with self._locks[index]:
+            return assembled in self._shards[index]
+
+    def use(self, instance: cott.COTT) -> None:
+        assembled = instance.assemble()
+        index = self._shard(assembled)
+        with self._locks[index]:
+            self._shards[index].add(assembled)
+
+    def claim(self, instance: cott.COTT) -> bool:
+        assembled = instance.assemble()
+        index = self._shard(assembled)
+        with self._locks[index]:
+            if assembled in self._shards[index]:
+                return False
+            self._shards[index].add(assembled)
+            return True
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
@@ -12,6 +12,7 @@ import collections
 import typing
 
 import cott
+from cott.kdf import DerivedKeyStore  # noqa: F401  # pylint: disable=unused-import  # re-exported for compatibility
 
 
 class KeyStore(cott.IKeyStore):
@@ -0,0 +1,135 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Production entry point running the COTT server via `gunicorn <https://gunicorn.org/>`_.
+
+The application is created once in the gunicorn master process (pre-fork loading), so the :class:`cott.IKeyStore` and
+:class:`cott.ICache` backends are wired up at startup and inherited by all workers.
+
+Every option can be given on the command line or via an environment variable (e.g. ``COTT_WORKERS``):
+
+.. code-block:: bash
+
+  python -m cott.server.production --bind 0.0.0.0:5000 --workers 4 --threads 2
+"""
+
+from __future__ import annotations
+
+__all__ = ["Application", "Options", "main"]
+
+import argparse
+import dataclasses
+import logging
+import os
+import typing
+
+import flask
+import gunicorn.app.base
+
+import cott
+from cott.server import create_app
+from cott.server.cache import Cache, ShardedCache
+
+
+@dataclasses.dataclass
+class Options:
+    """
+    Tuning options of the production server.
+    """
+
+    #: Address(es) to listen on, e.g. `0.0.0.0:5000`
+    bind: str = "0.0.0.0:5000"
+    #: Number of worker processes handling requests
+    workers: int = 1
+    #: Number of threads per worker process, using gunicorn's threaded worker if greater than 1
+    threads: int = 1
+    #: Seconds to wait for requests on a keep-alive connection
+    keepalive: int = 2
+    #: Maximum number of pending connections
+    backlog: int = 2048
+    #: Seconds a worker may be silent before being restarted
+    timeout: int = 30
+    #: Whether the application (including its backends) is loaded before forking workers
+    preload: bool = True
+
+    def gunicorn_config(self) -> typing.Dict[str, typing.Any]:
+        """
+        Converts options to gunicorn configuration settings.
+
+        :returns: Mapping of gunicorn setting names to values.
+        """
+        return {
+            "bind": self.bind,
+            "workers": self.workers,
+            "threads": self.threads,
+            "keepalive": self.keepalive,
+            "backlog": self.backlog,
+            "timeout": self.timeout,
+            "preload_app": self.preload,
+        }
+
+
+class Application(gunicorn.app.base.BaseApplication):  # pylint: disable=abstract-method
+    """
+    Gunicorn application serving the COTT flask server created by :func:`cott.server.create_app`.
+    """
+
+    def __init__(self, options: Options, keystore: typing.Optional[cott.IKeyStore] = None, cache: typing.Optional[cott.ICache] = None) -> None:
+        """
+        Constructor storing server configuration.
+
+        :param options: Tuning options of the server.
+        :param keystore: Optional :class:`cott.IKeyStore` passed to :func:`cott.server.create_app`, by default the configured backend is used.
+        :param cache: Optional :class:`cott.ICache` passed to :func:`cott.server.create_app`, by default the configured backend is used.
+        """
+        self._options = options
+        self._keystore = keystore
+        self._cache = cache
+        self._application: typing.Optional[flask.Flask] = None
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self._options.gunicorn_config().items():
+            self.cfg.set(key, value)
+
+    def load(self) -> flask.Flask:  # type: ignore[override]
+        if self._application is None:
+            self._application = create_app(keystore=self._keystore, cache=self._cache, debug=False)
+            if self._options.workers > 1 and isinstance(self._application.extensions["cott"]["cache"], (Cache, ShardedCache)):
+                logging.getLogger(__name__).warning("In-memory COTT cache is not shared between %d workers, replays may go undetected", self._options.workers)
+        return self._application
+
+
+def _parser() -> argparse.ArgumentParser:
+    """
+    Creates command line parser with defaults taken from `COTT_*` environment variables.
+
+    :returns: Command line parser for :class:`Options`.
+    """
+    defaults = Options()
+    parser = argparse.ArgumentParser(prog="python -m cott.server.production", description="Runs the COTT server via gunicorn.")
+    for field in dataclasses.fields(Options):
+        default = getattr(defaults, field.name)
+        env = f"COTT_{field.name.upper()}"
+        if isinstance(default, bool):
+            value = os.environ.get(env, str(default)).lower() in ("1", "true", "yes")
+            parser.add_argument(f"--{field.name}", action=argparse.BooleanOptionalAction, default=value, help=f"(env: {env}, default: %(default)s)")
+        else:
+            value = type(default)(os.environ.get(env, default))
+            parser.add_argument(f"--{field.name}", type=type(default), default=value, help=f"(env: {env}, default: %(default)s)")
+    return parser
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> None:
+    """
+    Parses command line and runs production server until terminated.
+
+    :param argv: Command line arguments, by default :data:`sys.argv` is used.
+    """
+    arguments = _parser().parse_args(argv)
+    Application(Options(**vars(arguments))).run()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -0,0 +1,122 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Precompiled rendering of the COTT validation result page.
+
+The page is mostly static, so :class:`PageRenderer` renders the template once per :class:`Outcome` and only splices in the
+hex encoded fields of the validated :class:`cott.COTT` for every request.
+"""
+
+from __future__ import annotations
+
+__all__ = ["Outcome", "PageRenderer"]
+
+import enum
+import re
+import typing
+
+import flask
+
+import cott
+
+
+class Outcome(enum.Enum):
+    """
+    Possible outcomes of a COTT validation with their HTTP status code and displayed status.
+    """
+
+    INVALID = (400, "Syntactically invalid / missing COTT", "orange")
+    UNKNOWN_UID = (404, "Unknown UID", "orange")
+    WRONG_KEY = (403, "Invalid MAC (wrong key)", "orange")
+    USED = (429, "COTT previously used", "orange")
+    FRESH = (200, "Fresh and valid COTT", "green")
+
+    def __init__(self, status: int, label: str, color: str) -> None:
+        #: HTTP status code returned for outcome
+        self.status = status
+        #: Label of status badge displayed on page
+        self.label = label
+        #: Color of status badge displayed on page
+        self.color = color
+
+
+#: COTT fields spliced into precompiled pages
+_FIELDS = ("header", "uid", "random", "mac")
+
+#: Pattern matching field placeholders in pages rendered by :meth:`PageRenderer._compile`
+_PLACEHOLDER = re.compile("@@(" + "|".join(_FIELDS) + ")@@")
+
+
+class PageRenderer:
+    """
+    Renders COTT validation pages from precompiled static page fragments.
+
+    Pages are marked as not cacheable because a cached result would hide replays from the server. The page for missing or
+    syntactically invalid COTTs is completely static and served from the precompiled bytes without any per-request
+    rendering. The static stylesheet is served separately via flask's static route, supporting conditional requests.
+    """
+
+    def __init__(self, app: flask.Flask, template: str = "index.html") -> None:
+        """
+        Constructor storing rendering configuration. Pages are compiled lazily on first use.
+
+        :param app: Flask application providing the Jinja environment for the template.
+        :param template: Name of template to be rendered.
+        """
+        self._app = app
+        self._template = template
+        self._compiled: typing.Dict[Outcome, typing.List[bytes | str]] = {}
+
+    def _compile(self, outcome: Outcome) -> typing.List[bytes | str]:
+        """
+        Renders template for given outcome with placeholders for all COTT fields.
+
+        :param outcome: Outcome to render page for.
+        :returns: Alternating list of static page fragments (`bytes`) and names of COTT fields (`str`) to be spliced in between.
+        """
+        placeholders = None if outcome is Outcome.INVALID else {field: f"@@{field}@@" for field in _FIELDS}
+        with self._app.app_context():
+            page = flask.render_template(self._template, cott=placeholders, outcome=outcome)
+        return [part.encode() if index % 2 == 0 else part for index, part in enumerate(_PLACEHOLDER.split(page))]
+
+    def _fragments(self, outcome: Outcome) -> typing.List[bytes | str]:
+        """
+        Returns compiled page fragments for given outcome, recompiling in debug mode to pick up template changes.
+
+        :param outcome: Outcome to get page fragments for.
+        :returns: Compiled page fragments as returned by :meth:`PageRenderer._compile`.
+        """
+        if self._app.debug:  # pragma: no cover
+            return self._compile(outcome)
+        if outcome not in self._compiled:
+            self._compiled[outcome] = self._compile(outcome)
+        return self._compiled[outcome]
+
+    def page(self, outcome: Outcome, token: typing.Optional[cott.COTT] = None) -> bytes:
+        """
+        Renders complete page for given outcome.
+
+        :param outcome: Outcome of COTT validation.
+        :param token: Validated COTT, not required for :attr:`Outcome.INVALID`.
+        :returns: UTF-8 encoded HTML page.
+        """
+        fragments = self._fragments(outcome)
+        if len(fragments) == 1:
+            return typing.cast(bytes, fragments[0])
+        if token is None:
+            raise ValueError(f"COTT required to render page for outcome {outcome.name}")
+        return b"".join(part if isinstance(part, bytes) else getattr(token, part).hex().encode() for part in fragments)
+
+    def render(self, outcome: Outcome, token: typing.Optional[cott.COTT] = None) -> flask.Response:
+        """
+        Creates HTTP response for given outcome, including caching headers.
+
+        :param outcome: Outcome of COTT validation.
+        :param token: Validated COTT, not required for :attr:`Outcome.INVALID`.
+        :returns: HTTP response to be returned by endpoint.
+        """
+        page = self.page(outcome, token)
+        response = flask.Response(page, status=outcome.status, content_type="text/html; charset=utf-8")
+        response.headers["Cache-Control"] = "no-store"
+        return response
@@ -0,0 +1,158 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Test cases for :mod:`cott.audit` log auditor.
+"""
+
+import os
+import pathlib
+
+import pytest
+
+import cott
+import cott.audit
+import cott.generator
+
+
+def _line(token: bytes) -> bytes:
+    """
+    Creates access log line for request with given token.
+    """
+    encoded = cott.COTT.dissemble(token).encode().replace(b"=", b"%3D")
+    return b'127.0.0.1 - - [31/May/2024:12:00:00 +0000] "GET /?cott=' + encoded + b' HTTP/1.1" 200 4096 "-" "-"\n'
+
+
+def test_audit(tmp_path: pathlib.Path) -> None:
+    """
+    Tests that :class:`cott.audit.Auditor` detects replayed and forged tokens per UID.
+    """
+    fleet = cott.generator.Fleet.create(5, seed=0)
+    batch = cott.generator.TokenGenerator(fleet, replayed=0.2, forged=0.2, seed=0).batch(500)
+    log = tmp_path / "access.log"
+    log.write_bytes(b"".join(_line(token) for _, token in batch) + b'127.0.0.1 "GET /?cott=MDA= HTTP/1.1" 400\n' + b'"GET /healthcheck"\n')
+
+    with cott.audit.Auditor(tmp_path / "audit.db", fleet) as auditor:
+        report = auditor.audit(log)
+    assert report.lines == 502
+    assert report.bytes == log.stat().st_size
+    assert report.malformed == 1
+    assert sum(stats.tokens for stats in report.uids.values()) == 500
+    assert sum(stats.replayed for stats in report.uids.values()) >= sum(kind is cott.generator.TokenKind.REPLAYED for kind, _ in batch)
+    assert sum(stats.mac_failures for stats in report.uids.values()) == sum(kind is cott.generator.TokenKind.FORGED for kind, _ in batch)
+    assert set(report.anomalies(replays=1, mac_failures=1)) == set(report.uids)
+    assert not report.anomalies(replays=501, mac_failures=501)
+
+
+def test_audit_referer(tmp_path: pathlib.Path) -> None:
+    """
+    Tests that :class:`cott.audit.Auditor` ignores COTTs outside of the request target, e.g. in the Referer field.
+    """
+    token = cott.generator.TokenGenerator(cott.generator.Fleet.create(1, seed=0), seed=0).batch(1)[0][1]
+    page = _line(token)
+    referer = page.split(b'"')[1].split(b" ")[1]
+    favicon = b'127.0.0.1 - - [31/May/2024:12:00:01 +0000] "GET /favicon.ico HTTP/1.1" 404 207 "https://host' + referer + b'" "Mozilla/5.0"\n'
+    log = tmp_path / "access.log"
+    log.write_bytes(page + favicon)
+    with cott.audit.Auditor(tmp_path / "audit.db") as auditor:
+        report = auditor.audit(log)
+    assert report.lines == 2
+    assert [(stats.tokens, stats.replayed) for stats in report.uids.values()] == [(1, 0)]
+    assert not report.anomalies()
+
+
+def test_audit_lenient_decoding(tmp_path: pathlib.Path) -> None:
+    """
+    Tests that :class:`cott.audit.Auditor` decodes COTTs as leniently as the server, detecting replays with inserted junk.
+    """
+    token = cott.generator.TokenGenerator(cott.generator.Fleet.create(1, seed=0), seed=0).batch(1)[0][1]
+    page = _line(token)
+    encoded = cott.COTT.dissemble(token).encode().replace(b"=", b"%3D")
+    log = tmp_path / "access.log"
+    log.write_bytes(page + page.replace(encoded, encoded[:4] + b"." + encoded[4:]))
+    with cott.audit.Auditor(tmp_path / "audit.db") as auditor:
+        report = auditor.audit(log)
+    assert report.malformed == 0
+    assert [(stats.tokens, stats.replayed) for stats in report.uids.values()] == [(2, 1)]
+
+
+def test_audit_incremental(tmp_path: pathlib.Path) -> None:
+    """
+    Tests that :class:`cott.audit.Auditor` only processes new data and detects replays across runs and rotated files.
+    """
+    fleet = cott.generator.Fleet.create(5, seed=0)
+    first, second = (token for _, token in cott.generator.TokenGenerator(fleet, seed=0).batch(2))
+    log = tmp_path / "access.log"
+    log.write_bytes(_line(first) + _line(second)[:20])
+    with cott.audit.Auditor(tmp_path / "audit.db") as auditor:
+        assert auditor.audit(log).lines == 1
+        assert auditor.audit(log).lines == 0
+
+    with log.open("ab") as file:
+        file.write(_line(second)[20:] + _line(first))
+    rotated = tmp_path / "access.log.1"
+    os.rename(log, rotated)
+    log.write_bytes(_line(second))
+    with cott.audit.Auditor(tmp_path / "audit.db", fleet) as auditor:
+        report = auditor.audit_all([rotated, log])
+    assert report.lines == 3
+    assert sum(stats.replayed for stats in report.uids.values()) == 2
+    assert not any(stats.mac_failures for stats in report.uids.values())
+
+    log.write_bytes(b"")
+    with cott.audit.Auditor(tmp_path / "audit.db", fleet) as auditor:
+        assert auditor.audit(log).lines == 0
+
+
+def test_audit_fingerprint(tmp_path: pathlib.Path) -> None:
+    """
+    Tests that :class:`cott.audit.Auditor` audits a file from the start if its first line changed, e.g. due to inode reuse.
+    """
+    fleet = cott.generator.Fleet.create(5, seed=0)
+    first, second, third = (token for _, token in cott.generator.TokenGenerator(fleet, seed=0).batch(3))
+    log = tmp_path / "access.log"
+    log.write_bytes(_line(first))
+    with cott.audit.Auditor(tmp_path / "audit.db") as auditor:
+        assert auditor.audit(log).lines == 1
+        log.write_bytes(_line(second) + _line(third))
+        report = auditor.audit(log)
+    assert report.lines == 2
+    assert not any(stats.replayed for stats in report.uids.values())
+
+
+def test_audit_prune(tmp_path: pathlib.Path) -> None:
+    """
+    Tests that :class:`cott.audit.Auditor` removes checkpoints of log files that no longer exist.
+    """
+    fleet = cott.generator.Fleet.create(5, seed=0)
+    first, second = (token for _, token in cott.generator.TokenGenerator(fleet, seed=0).batch(2))
+    log = tmp_path / "access.log"
+    rotated = tmp_path / "access.log.1"
+    log.write_bytes(_line(first))
+    with cott.audit.Auditor(tmp_path / "audit.db") as auditor:
+        auditor.audit_all([log])
+        os.rename(log, rotated)
+        log.write_bytes(_line(second))
+        assert auditor.audit_all([rotated, log]).lines == 1
+        assert auditor.prune() == 0
+        os.remove(rotated)
+        assert auditor.prune() == 1
+        assert auditor.prune() == 0
+        assert auditor.audit(log).lines == 0
+
+
+def test_audit_main(tmp_path: pathlib.Path, capsys: pytest.CaptureFixture[str]) -> None:
+    """
+    Tests that :func:`cott.audit.main` reports anomalies and rejects invalid master keys as usage errors.
+    """
+    fleet = cott.generator.Fleet.create(1, key=bytes(16), seed=0)
+    token = cott.generator.TokenGenerator(fleet, seed=0).batch(1)[0][1]
+    log = tmp_path / "access.log"
+    log.write_bytes(_line(token) * 2)
+    cott.audit.main(["--index", str(tmp_path / "audit.db"), "--master-key", "00" * 16, str(log)])
+    assert cott.COTT.dissemble(token).uid.hex() in capsys.readouterr().out
+
+    with pytest.raises(SystemExit) as error:
+        cott.audit.main(["--index", str(tmp_path / "audit.db"), "--master-key", "0001", str(log)])
+    assert error.value.code == 2
+    assert "invalid master key" in capsys.readouterr().err
@@ -189,6 +189,33 @@ def test_cott_verify() -> None:
     assert created.verify(bytes.fromhex("000102030405060708090a0b0c0d0e0f"))
 
 
+def test_cott_generate() -> None:
+    """
+    Tests that :meth:`cott.COTT.generate` creates COTT with correct AES CMAC.
+    """
+    created = cott.COTT.generate(bytes.fromhex("0001"), bytes.fromhex("02030405060708"), bytes.fromhex("090a0b0c0d0e0f10"), bytes.fromhex("000102030405060708090a0b0c0d0e0f"))
+    assert created.mac == bytes.fromhex("dbab59423fbec5a7be32c48ce1a80e33")
+
+
+@pytest.mark.parametrize("length", [0, 1, 15, 16, 17, 32, 33])
+def test_generate_cmacs(length: int) -> None:
+    """
+    Tests that batched AES CMAC generation matches generation for single messages.
+    """
+    key = cott.Key(bytes.fromhex("000102030405060708090a0b0c0d0e0f"))
+    data = [bytes([index]) * length for index in range(4)]
+    expected = b"".join(cott._generate_cmac(message, key) for message in data)  # pylint: disable=protected-access
+    assert cott._generate_cmacs(data, key) == expected  # pylint: disable=protected-access
+
+
+def test_generate_cmacs_invalid() -> None:
+    """
+    Tests that batched AES CMAC generation detects messages of different length.
+    """
+    with pytest.raises(ValueError):
+        cott._generate_cmacs([b"\x00", b"\x00\x01"], cott.Key(bytes(16)))  # pylint: disable=protected-access
+
+
 def test_cott_verify_wrong_key() -> None:
     """
     Tests that :meth:`cott.COTT.verify` can detect authenticity of COTT by checking AES CMAC.
@@ -0,0 +1,98 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Test cases for :mod:`cott.generator` token generator.
+"""
+
+import itertools
+
+import pytest
+
+import cott
+import cott.generator
+
+
+def test_fleet() -> None:
+    """
+    Tests that :meth:`cott.generator.Fleet.create` creates distinct devices usable as :class:`cott.IKeyStore`.
+    """
+    fleet = cott.generator.Fleet.create(100, seed=0)
+    assert len(fleet) == 100
+    assert len({key for _, key in fleet.items()}) == 100
+    uid, key = next(iter(fleet.items()))
+    assert fleet.get(uid) == key
+    assert fleet.get(bytes(7)) is None
+    fleet.set(bytes(7), bytes(16))
+    assert fleet.get(bytes(7)) == bytes(16)
+
+
+@pytest.mark.parametrize("key", [None, bytes.fromhex("000102030405060708090a0b0c0d0e0f")])
+def test_generator_kinds(key: bytes | None) -> None:
+    """
+    Tests that :class:`cott.generator.TokenGenerator` emits valid, replayed and forged tokens.
+    """
+    fleet = cott.generator.Fleet.create(10, key=key, seed=0)
+    seen = set()
+    for kind, token in cott.generator.TokenGenerator(fleet, replayed=0.2, forged=0.2, batch_size=64, seed=0).stream(1000):
+        fleet_key = fleet.get(token.uid)
+        assert fleet_key is not None
+        assert token.verify(fleet_key) == (kind is not cott.generator.TokenKind.FORGED)
+        if kind is cott.generator.TokenKind.VALID:
+            assert token not in seen
+        if kind is cott.generator.TokenKind.REPLAYED:
+            assert token in seen
+        seen.add(token)
+
+
+def test_generator_ratios() -> None:
+    """
+    Tests that :class:`cott.generator.TokenGenerator` distributes token kinds according to configured ratios.
+    """
+    fleet = cott.generator.Fleet.create(10, seed=0)
+    batch = cott.generator.TokenGenerator(fleet, replayed=0.25, forged=0.5, seed=0).batch(10000)
+    kinds = [kind for kind, _ in batch]
+    assert abs(kinds.count(cott.generator.TokenKind.REPLAYED) - 2500) < 250
+    assert abs(kinds.count(cott.generator.TokenKind.FORGED) - 5000) < 250
+
+
+def test_generator_seed() -> None:
+    """
+    Tests that :class:`cott.generator.TokenGenerator` creates reproducible streams when seeded.
+    """
+    fleet = cott.generator.Fleet.create(10, seed=0)
+    first = cott.generator.TokenGenerator(fleet, replayed=0.1, forged=0.1, seed=1).batch()
+    second = cott.generator.TokenGenerator(fleet, replayed=0.1, forged=0.1, seed=1).batch()
+    assert first == second
+
+
+def test_generator_batch_size() -> None:
+    """
+    Tests that :meth:`cott.generator.TokenGenerator.batch` uses the configured batch size unless a size is given.
+    """
+    generator = cott.generator.TokenGenerator(cott.generator.Fleet.create(10, seed=0), replayed=0.1, forged=0.1, batch_size=32, seed=0)
+    assert len(generator.batch()) == 32
+    assert len(generator.batch(5)) == 5
+    assert not generator.batch(0)
+
+
+@pytest.mark.parametrize(["replayed", "forged"], [(-0.1, 0.0), (0.0, 1.1), (0.5, 0.6), (1.0, 0.0)])
+def test_generator_invalid(replayed: float, forged: float) -> None:
+    """
+    Tests that :class:`cott.generator.TokenGenerator` detects invalid token ratios.
+    """
+    with pytest.raises(ValueError):
+        cott.generator.TokenGenerator(cott.generator.Fleet.create(1), replayed=replayed, forged=forged)
+
+
+def test_parallel_batches() -> None:
+    """
+    Tests that :func:`cott.generator.parallel_batches` generates valid tokens in worker processes.
+    """
+    fleet = cott.generator.Fleet.create(10, seed=0)
+    batches = cott.generator.parallel_batches(fleet, processes=2, batch_size=16)
+    for kind, token in itertools.chain.from_iterable(itertools.islice(batches, 4)):
+        assert kind is cott.generator.TokenKind.VALID
+        parsed = cott.COTT.dissemble(token)
+        assert parsed.verify(fleet.get(parsed.uid) or b"")
+    batches.close()
@@ -0,0 +1,43 @@
+# SPDX-FileCopyrightText: 2024 Infineon Technologies AG
+# SPDX-License-Identifier: MIT
+
+"""
+Test cases for :mod:`cott.kdf` key diversification.
+"""
+
+import subprocess
+import sys
+
+import cott.kdf
+import cott.server.keystore
+
+
+def test_derived_keystore() -> None:
+    """
+    Sanity checks for class:`cott.kdf.DerivedKeyStore` implementation.
+    """
+    keystore = cott.kdf.DerivedKeyStore(bytes.fromhex("000102030405060708090a0b0c0d0e0f"), capacity=1)
+    derived = bytes.fromhex("90b7ea42012baeec5a504535c1382fc8")
+    assert keystore.get(bytes.fromhex("02030405060708")) == derived
+    assert keystore.get(bytes.fromhex("02030405060708")) == derived
+    assert keystore.get(bytes.fromhex("01020304050607")) != derived
+    assert keystore.derive_many([bytes.fromhex("01020304050607"), bytes.fromhex("02030405060708")])[1] == derived
+    keystore.prefetch([bytes.fromhex("02030405060708")])
+    assert keystore.get(bytes.fromhex("02030405060708")) == derived
+    keystore.set(bytes.fromhex("02030405060708"), bytes.fromhex("101112131415161718191a1b1c1d1e1f"))
+    assert keystore.get(bytes.fromhex("02030405060708")) == bytes.fromhex("101112131415161718191a1b1c1d1e1f")
+
+
+def test_derived_keystore_compatibility() -> None:
+    """
+    Tests that :class:`cott.kdf.DerivedKeyStore` is still available from :mod:`cott.server.keystore`.
+    """
+    assert cott.server.keystore.DerivedKeyStore is cott.kdf.DerivedKeyStore
+
+
+def test_derived_keystore_without_flask() -> None:
+    """
+    Tests that :mod:`cott.kdf` and :mod:`cott.audit` can be used without the flask server dependencies.
+    """
+    script = "import sys; import cott.audit, cott.kdf; assert 'flask' not in sys.modules and 'cott.server' not in sys.modules"
+    subprocess.run([sys.executable, "-c", script], check=True)
@@ -8,6 +8,8 @@
 Test cases for :mod:`cott.server` flask server.
 """
 
+import concurrent.futures
+import pathlib
 import typing
 
 import flask
@@ -15,9 +17,13 @@ import flask.testing
 import pytest
 
 import cott
+import cott.generator
+import cott.kdf
 import cott.server
+import cott.server.backends
 import cott.server.cache
 import cott.server.keystore
+import cott.server.production
 
 
 class KeyStore(cott.IKeyStore):
@@ -38,6 +44,27 @@ class KeyStore(cott.IKeyStore):
         self._lookup[cott.UID7(uid)] = cott.Key(key)
 
 
+class LegacyCache:
+    """
+    Test cache structurally implementing :class:`cott.ICache` without `claim`, as written before it was added.
+    """
+
+    def __init__(self) -> None:
+        self._tokens: typing.Set[bytes] = set()
+
+    def used(self, instance: cott.COTT) -> bool:
+        """
+        Checks if given COTT has been previously used.
+        """
+        return instance.assemble() in self._tokens
+
+    def use(self, instance: cott.COTT) -> None:
+        """
+        Marks given COTT as used.
+        """
+        self._tokens.add(instance.assemble())
+
+
 @pytest.fixture()
 def app() -> typing.Generator[flask.Flask, None, None]:
     """
@@ -115,6 +142,47 @@ def test_cott_wrong_key(client: flask.testing.FlaskClient) -> None:
     assert response.status_code == 403
 
 
+def test_cott_page(client: flask.testing.FlaskClient) -> None:
+    """
+    Tests that COTT validation endpoint splices parsed COTT fields and status into the result page.
+    """
+    response = client.get("/", query_string={"cott": "AAECAwQFBgcICQoLDA0ODxDbq1lCP77Fp74yxIzhqA4z"})
+    assert response.headers["Cache-Control"] == "no-store"
+    assert b'<td class="hex">02030405060708</td>' in response.data
+    assert b'<td class="hex">dbab59423fbec5a7be32c48ce1a80e33</td>' in response.data
+    assert b'label="Fresh and valid COTT"' in response.data
+    response = client.get("/", query_string={"cott": "AAECAwQFBgcICQoLDA0ODxDbq1lCP77Fp74yxIzhqA4z"})
+    assert b'label="COTT previously used"' in response.data
+
+
+def test_cott_missing_static(client: flask.testing.FlaskClient) -> None:
+    """
+    Tests that static page for missing `cott` value is served completely rendered and never answered conditionally.
+    """
+    response = client.get("/", headers={"If-None-Match": "*"})
+    assert response.status_code == 400
+    assert b'label="Syntactically invalid / missing COTT"' in response.data
+    assert b"@@" not in response.data
+    assert response.headers["Cache-Control"] == "no-store"
+    assert "ETag" not in response.headers
+    assert b'href="static/style.css"' in response.data
+
+
+def test_stylesheet_conditional(client: flask.testing.FlaskClient) -> None:
+    """
+    Tests that static stylesheet is cacheable and supports conditional requests via its `ETag`.
+    """
+    response = client.get("/static/style.css")
+    assert response.status_code == 200
+    assert b".hex" in response.data
+    assert "max-age=3600" in response.headers["Cache-Control"]
+    etag = response.headers["ETag"]
+    response.close()
+    response = client.get("/static/style.css", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert not response.data
+
+
 def test_keystore() -> None:
     """
     Sanity checks for default class:`cott.server.keystore.KeyStore` implementation.
@@ -136,6 +204,124 @@ def test_cache() -> None:
     assert cache.used(token)
 
 
+def test_backends() -> None:
+    """
+    Tests that :mod:`cott.server.backends` creates configured backends.
+    """
+    assert isinstance(cott.server.backends.create_keystore(), cott.server.keystore.KeyStore)
+    assert isinstance(cott.server.backends.create_cache({"backend": "memory"}), cott.server.cache.Cache)
+    assert isinstance(cott.server.backends.create_cache({"backend": "sharded", "shards": 16}), cott.server.cache.ShardedCache)
+    keystore = cott.server.backends.create_keystore({"BACKEND": "derived", "MASTER": "000102030405060708090a0b0c0d0e0f", "CAPACITY": 10})
+    assert isinstance(keystore, cott.kdf.DerivedKeyStore)
+    assert keystore.get(bytes.fromhex("02030405060708")) == bytes.fromhex("90b7ea42012baeec5a504535c1382fc8")
+    assert isinstance(cott.server.backends.create_keystore({"backend": "cott.generator:Fleet"}), cott.generator.Fleet)
+
+
+def test_backends_empty_keystore() -> None:
+    """
+    Tests that :func:`cott.server.create_app` uses a given key store even if it is empty.
+    """
+    keystore = cott.generator.Fleet()
+    app = cott.server.create_app(keystore=keystore, debug=False)
+    assert app.extensions["cott"]["keystore"] is keystore
+    token = cott.COTT.generate(bytes.fromhex("0001"), bytes.fromhex("02030405060708"), bytes(8), bytes(16))
+    assert app.test_client().get("/", query_string={"cott": token.encode()}).status_code == 404
+
+
+@pytest.mark.parametrize("config", [
+    {"backend": "unknown"},
+    {"backend": "derived"},
+    {"backend": "derived", "master": 1234},
+    {"backend": "default", "capacity": 10},
+    "unknown",
+    5,
+    ["default"],
+])
+def test_backends_invalid(config: typing.Any) -> None:
+    """
+    Tests that :mod:`cott.server.backends` detects invalid backend configuration.
+    """
+    with pytest.raises(ValueError):
+        cott.server.backends.create_keystore(config)
+
+
+def test_backends_config(monkeypatch: pytest.MonkeyPatch, tmp_path: pathlib.Path) -> None:
+    """
+    Tests that :func:`cott.server.create_app` creates backends configured via config file and environment variables.
+    """
+    config = tmp_path / "config.json"
+    config.write_text('{"KEYSTORE": {"backend": "derived", "master": "ffffffffffffffffffffffffffffffff"}}')
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("COTT_CONFIG", config.name)
+    monkeypatch.setenv("COTT_BACKEND_KEYSTORE__MASTER", "000102030405060708090a0b0c0d0e0f")
+    monkeypatch.setenv("COTT_BACKEND_CACHE", "sharded")
+    monkeypatch.setenv("COTT_DEBUG", "true")
+    monkeypatch.setenv("COTT_WORKERS", "4")
+    app = cott.server.create_app()
+    assert not app.debug
+    assert "WORKERS" not in app.config
+    assert isinstance(app.extensions["cott"]["keystore"], cott.kdf.DerivedKeyStore)
+    assert isinstance(app.extensions["cott"]["cache"], cott.server.cache.ShardedCache)
+    token = cott.COTT.generate(bytes.fromhex("0001"), bytes.fromhex("02030405060708"), bytes(8), bytes.fromhex("90b7ea42012baeec5a504535c1382fc8"))
+    assert app.test_client().get("/", query_string={"cott": token.encode()}).status_code == 200
+
+
+@pytest.mark.parametrize("factory", [cott.server.cache.Cache, lambda: cott.server.cache.ShardedCache(shards=4)])
+def test_cache_claim(factory: typing.Callable[[], cott.ICache]) -> None:
+    """
+    Tests that caches only allow a single concurrent claim for every COTT.
+    """
+    cache = factory()
+    tokens = [cott.COTT.dissemble(token) for _, token in cott.generator.TokenGenerator(cott.generator.Fleet.create(10, seed=0), seed=0).batch(1000)]
+    with concurrent.futures.ThreadPoolExecutor(8) as executor:
+        claims = list(executor.map(lambda index: cache.claim(tokens[index % len(tokens)]), range(8 * len(tokens))))
+    assert sum(claims) == len(tokens)
+    assert all(cache.used(token) for token in tokens)
+    if isinstance(cache, cott.server.cache.ShardedCache):
+        assert sum(bool(shard) for shard in cache._shards) > 1  # pylint: disable=protected-access
+
+
+def test_sharded_cache() -> None:
+    """
+    Sanity checks for class:`cott.server.cache.ShardedCache` implementation.
+    """
+    cache = cott.server.cache.ShardedCache(shards=4)
+    token = cott.COTT(bytes.fromhex("0001"), bytes.fromhex("02030405060708"), bytes.fromhex("090a0b0c0d0e0f10"), bytes.fromhex("dbab59423fbec5a7be32c48ce1a80e33"))
+    assert not cache.used(token)
+    cache.use(token)
+    assert cache.used(token)
+    assert not cache.claim(token)
+    assert len(cache) == 1
+    with pytest.raises(ValueError):
+        cott.server.cache.ShardedCache(shards=0)
+
+
+def test_cache_without_claim() -> None:
+    """
+    Tests that :func:`cott.server.create_app` still supports caches only implementing `used` and `use`.
+    """
+    app = cott.server.create_app(cache=typing.cast(cott.ICache, LegacyCache()), debug=False)
+    token = cott.COTT.generate(bytes.fromhex("0001"), bytes.fromhex("02030405060708"), bytes(8), bytes.fromhex("373F5060409BA014B69A627622F23B59"))
+    assert app.test_client().get("/", query_string={"cott": token.encode()}).status_code == 200
+    assert app.test_client().get("/", query_string={"cott": token.encode()}).status_code == 429
+
+
+def test_sharded_cache_empty() -> None:
+    """
+    Tests that an empty class:`cott.server.cache.ShardedCache` is used by :func:`cott.server.create_app` and the production server.
+    """
+    cache = cott.server.cache.ShardedCache()
+    app = cott.server.create_app(cache=cache, debug=False)
+    assert app.extensions["cott"]["cache"] is cache
+    token = cott.COTT.generate(bytes.fromhex("0001"), bytes.fromhex("02030405060708"), bytes(8), bytes.fromhex("373F5060409BA014B69A627622F23B59"))
+    assert app.test_client().get("/", query_string={"cott": token.encode()}).status_code == 200
+    assert cache.used(token)
+
+    cache = cott.server.cache.ShardedCache()
+    application = cott.server.production.Application(cott.server.production.Options(), cache=cache)
+    assert application.load().extensions["cott"]["cache"] is cache
+
+
 def test_healthcheck(client: flask.testing.FlaskClient) -> None:
     """
     Tests that healthcheck API returns expected status.
@@ -143,3 +329,21 @@ def test_healthcheck(client: flask.testing.FlaskClient) -> None:
     response = client.get("/healthcheck")
     assert response.json == {"status": "running"}
     assert response.status_code == 200
+
+
+def test_production_options(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Tests that :mod:`cott.server.production` forwards command line and environment options to gunicorn.
+    """
+    monkeypatch.setenv("COTT_THREADS", "8")
+    monkeypatch.setenv("COTT_PRELOAD", "false")
+    arguments = cott.server.production._parser().parse_args(["--workers", "4", "--backlog", "64"])  # pylint: disable=protected-access
+    options = cott.server.production.Options(**vars(arguments))
+    assert options == cott.server.production.Options(workers=4, threads=8, backlog=64, preload=False)
+
+    application = cott.server.production.Application(options, keystore=KeyStore())
+    assert application.cfg.workers == 4
+    assert application.cfg.threads == 8
+    assert application.cfg.backlog == 64
+    assert not application.cfg.preload_app
+    assert application.load() is application.load()